@@ -4,9 +4,45 @@ Author: Emily Samantha Zarry
 ID: 32558945
 
 """
-
-
-def analyze(results: list, roster: int, score: int) -> list:
+import hashlib
+import heapq
+import json
+import os
+import struct
+import sys
+import time
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from itertools import islice
+
+# Process pools, shared memory, mmap, tempfile, tracemalloc, asyncio and NumPy are imported inside the
+# functions that use them, so importing this module stays cheap for code that only calls analyze
+
+# Table used by bytes.translate to turn the ASCII letters A-Z into the codes 0-25
+TO_CODES = bytes.maketrans(bytes(range(65, 91)), bytes(range(26)))
+
+# Header of a binary match file: magic, version, roster, team width and number of matches
+MATCH_FILE_MAGIC = b"A1MF"
+MATCH_FILE_VERSION = 1
+MATCH_FILE_HEADER = struct.Struct("<4sBBHQ")
+
+# Header of a sorted snapshot file: magic, version, team width, number of matches and the
+# fingerprint of the results it was sorted from, followed by the score index
+SNAPSHOT_MAGIC = b"A1SS"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<4sBxHQ20s")
+SNAPSHOT_INDEX = struct.Struct("<202Q")
+
+# Context manager used for every stage when no profiler is given
+NO_PROFILER = nullcontext()
+
+# From this many matches importing NumPy pays for itself
+NUMPY_MIN_INPUT = 5000
+
+
+def analyze(results: list, roster: int, score: int, engine: str = "python",
+            cache: "CanonicalTeamCache" = None, profiler: "StageProfiler" = None) -> list:
     """
     Performs an analysis on tournament results. Uses radix sort and counting sort to perform
     the analysis on the list of matches.
@@ -21,6 +57,23 @@ def analyze(results: list, roster: int, score: int) -> list:
             For example, roster=5 indicates a character set of {A, B, C, D, E}
         score:
             The score we want to search for and return in searchedmatches.
+        engine:
+            Name of the sorting engine to use. "python" (the default) runs the pure-Python
+            radix sort below, "numpy" runs the vectorized engine in analyze_numpy, "packed"
+            sorts one composite integer key per match in analyze_packed and "table" sorts
+            the columnar MatchTable in analyze_table. "parallel" sorts shards of results in
+            worker processes and merges them in analyze_parallel. "hashed" removes duplicates
+            with hashing and only sorts the score buckets it returns, in analyze_hashed.
+            "msd" supports teams of different lengths, in analyze_msd. "shared" sorts ranges of a
+            shared memory copy of the MatchTable in worker processes, in analyze_shared.
+            "auto" picks one of them from the shape of results with choose_engine; it never picks
+            "python", so results is not modified.
+        cache:
+            Optional CanonicalTeamCache used to look up the sorted form of every team
+            instead of sorting it again. Only used by the "python" engine.
+        profiler:
+            Optional StageProfiler that records the time, rows and passes of every stage.
+            Other engines are recorded as a single stage.
 
     :Return:
         lst:
@@ -31,29 +84,51 @@ def analyze(results: list, roster: int, score: int) -> list:
     :Time Complexity: O(N * M), where N is the length of results and M is the number of characters in each team
     :Aux Space Complexity: O(N * M), where N is the length of results and M is the number of characters in each team
     """
-    # Create top10_matches and searched_matches arrays
+    # Pick the engine from the shape of results, recording the choice on the profiler
+    if engine == "auto":
+        engine, reason = choose_engine(results, roster)
+        if profiler is not None:
+            profiler.record({"stage": "choose_engine", "seconds": 0.0, "rows": len(results), "passes": 0,
+                             "engine": engine, "reason": reason})
+
+    # Hand the analysis over to another engine if it was requested
+    if engine != "python":
+        with profile_stage(profiler, "engine " + str(engine), len(results)):
+            return run_engine(engine, results, roster, score)
+
+    # Create top10_matches array
     top10matches = []
-    searchedmatches = []
 
     # Go through results and if a score is less than 50, switch it to its alternate format
-    add_reverse(results)
+    with profile_stage(profiler, "add_reverse", len(results)):
+        add_reverse(results)
 
     # Sort the team string in each match
-    for i in range(len(results)):  # O(N) * O(M)
-        results[i][0] = counting_sort_string(results[i][0], roster)
-        results[i][1] = counting_sort_string(results[i][1], roster)
+    with profile_stage(profiler, "counting_sort_string", 2 * len(results)):
+        if cache is not None:
+            for i in range(len(results)):  # O(N) * O(1) for teams that are already cached
+                results[i][0] = cache.canonical(results[i][0], roster)
+                results[i][1] = cache.canonical(results[i][1], roster)
+        else:
+            for i in range(len(results)):  # O(N) * O(M)
+                results[i][0] = counting_sort_string(results[i][0], roster)
+                results[i][1] = counting_sort_string(results[i][1], roster)
+
+    num_chars = 0 if len(results) == 0 else len(results[0][0])
 
     # Sort team2 in lexicographical order
-    results = radix_sort_team(results, roster, 1)  # O(M) * (N)
+    with profile_stage(profiler, "radix_sort_team team2", len(results), num_chars):
+        results = radix_sort_team(results, roster, 1)  # O(M) * (N)
 
     # Sort team1 in lexicographical order
-    results = radix_sort_team(results, roster, 0)  # O(M) * (N)
-
-    # Sort score in descending order
-    results = radix_sort_score(results)  # O(N)
+    with profile_stage(profiler, "radix_sort_team team1", len(results), num_chars):
+        results = radix_sort_team(results, roster, 0)  # O(M) * (N)
 
-    # Filter duplicate matches
-    filter_duplicates(results)
+    # Sort score in descending order, leaving out duplicate matches in the last pass and
+    # recording where every score starts and ends
+    with profile_stage(profiler, "radix_sort_score", len(results), 4):
+        score_index = [[0, 0] for i in range(101)]
+        results = radix_sort_score(results, score_index, compact=True)  # O(N)
 
     # If the number of matches in results is less than 10, set num_top_matches as the length of results
     num_top_matches = 10
@@ -61,22 +136,196 @@ def analyze(results: list, roster: int, score: int) -> list:
         num_top_matches = len(results)
 
     # Grab top 10 highest matches from sorted results
-    i = 0
-    appended = 0
-    while appended < num_top_matches:  # O(1)
-        if i == len(results):
-            break
-        if results[i] is not None:
-            top10matches.append(results[i])
-            appended += 1
-        i += 1
-
-    # Look for searchedmatches
-    find_searchedmatches(results, score, searchedmatches)
+    for i in range(num_top_matches):  # O(1)
+        top10matches.append(results[i])
+
+    # Look for searchedmatches using the score index
+    with profile_stage(profiler, "search_score_index", len(results)):
+        searchedmatches = search_score_index(results, score_index, score)
 
     return [top10matches, searchedmatches]
 
 
+def choose_engine(results: list, roster: int) -> tuple:
+    """
+    Function to pick the engine for analyze from the number of matches N, the team width M and
+    the roster. Teams of different lengths use the MSD radix sort, large inputs use the NumPy engine
+    when NumPy is installed, and everything else uses the hashed engine, which only sorts the score
+    buckets it returns. In measurements the hashed engine was faster than the packed and table
+    engines for every N, M and roster tried, including long teams over a tiny roster, and faster
+    than the pure-Python radix sort from about 20 matches up. The pure-Python radix sort is never
+    picked: it adds the reverse format to results and sorts its teams in place, and none of the
+    engines picked here modify results.
+
+    :Input:
+        results: The results list
+        roster: Positive integer to denote the character set used in team1 and team2
+
+    :Return:
+        tuple: (engine, reason), where engine is a name accepted by analyze and reason explains the choice
+
+    :Time Complexity: O(N), where N is the length of results
+    :Aux Space Complexity: O(1)
+    """
+    import importlib.util
+
+    n = len(results)
+    width = 0 if n == 0 else len(results[0][0])
+    shape = "N=" + str(n) + ", M=" + str(width) + ", roster=" + str(roster)
+
+    # Every other engine needs all teams to have the same length
+    for match in results:  # O(N)
+        if len(match[0]) != width or len(match[1]) != width:
+            return "msd", shape + ": teams have different lengths, so they are sorted with MSD radix sort"
+
+    if n >= NUMPY_MIN_INPUT and importlib.util.find_spec("numpy") is not None:
+        return "numpy", shape + ": large input and NumPy is installed, so the passes run vectorized"
+    return "hashed", (shape + ": hashing removes duplicates without the 2M+3 passes, "
+                      "and only returned buckets are sorted")
+
+
+def run_engine(engine: str, results: list, roster: int, score: int) -> list:
+    """
+    Function to run the analysis of analyze with one of the engines other than "python".
+
+    :Input:
+        engine: Name of the engine, as described in analyze
+        results: The results list
+        roster: Positive integer to denote the character set used in team1 and team2
+        score: The score we want to search for and return in searchedmatches
+
+    :Return:
+        lst: List of findings denoted as [top10matches, searchedmatches]
+
+    :Time Complexity: The time complexity of the engine
+    :Aux Space Complexity: The aux space complexity of the engine
+    """
+    if engine == "numpy":
+        return analyze_numpy(results, roster, score)
+    elif engine == "packed":
+        return analyze_packed(results, roster, score)
+    elif engine == "hashed":
+        return analyze_hashed(results, roster, score)
+    elif engine == "parallel":
+        return analyze_parallel(results, roster, score)
+    elif engine == "table":
+        return analyze_table(MatchTable.from_results(results, roster), score, virtual_reverse=True)
+    elif engine == "msd":
+        return analyze_msd(results, roster, score)
+    elif engine == "shared":
+        return analyze_shared(results, roster, score)
+    raise ValueError("Unknown engine: " + str(engine))
+
+
+class StageProfiler:
+    """
+    Records how long every stage of an analysis takes, how many rows it processed and how many
+    passes it made over them, and optionally the peak memory it allocated (using tracemalloc).
+
+    :Attributes:
+        stages: List of one dict per finished stage, with the keys "stage", "seconds", "rows",
+            "passes" and, if memory is tracked, "peak_memory" (in bytes)
+        track_memory: Whether the peak memory of every stage is measured
+        callback: Optional function called with the dict of every stage when it finishes
+    """
+
+    def __init__(self, track_memory: bool = False, callback=None) -> None:
+        """
+        Creates a profiler without any recorded stages.
+
+        :Input:
+            track_memory: Whether to measure the peak memory of every stage, which slows the stages down
+            callback: Optional function called with the dict of every stage when it finishes
+
+        :Time Complexity: O(1)
+        :Aux Space Complexity: O(1)
+        """
+        self.stages = []
+        self.track_memory = track_memory
+        self.callback = callback
+
+    @contextmanager
+    def stage(self, name: str, rows: int, passes: int = 1):
+        """
+        Context manager that records one stage.
+
+        :Input:
+            name: Name of the stage
+            rows: Number of rows processed by the stage
+            passes: Number of passes the stage makes over the rows
+
+        :Time Complexity: O(1) besides the stage itself
+        :Aux Space Complexity: O(1)
+        """
+        # Start tracing allocations for this stage only if nobody else is tracing already
+        started_tracing = False
+        if self.track_memory:
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record = {"stage": name, "seconds": time.perf_counter() - start, "rows": rows, "passes": passes}
+            if self.track_memory:
+                record["peak_memory"] = tracemalloc.get_traced_memory()[1] - memory_before
+                if started_tracing:
+                    tracemalloc.stop()
+            self.record(record)
+
+    def record(self, record: dict) -> None:
+        """
+        Records a finished stage, or a decision such as the engine picked by choose_engine, and
+        passes it to the callback.
+
+        :Input:
+            record: Dict with at least the keys "stage", "seconds", "rows" and "passes"
+
+        :Time Complexity: O(1) besides the callback
+        :Aux Space Complexity: O(1)
+        """
+        self.stages.append(record)
+        if self.callback is not None:
+            self.callback(record)
+
+    def total_seconds(self) -> float:
+        """
+        Returns the total time of all recorded stages.
+
+        :Time Complexity: O(S), where S is the number of recorded stages
+        :Aux Space Complexity: O(1)
+        """
+        return sum(record["seconds"] for record in self.stages)
+
+
+def profile_stage(profiler: StageProfiler, name: str, rows: int, passes: int = 1):
+    """
+    Function to get the context manager that records a stage on profiler, or one that does
+    nothing if there is no profiler.
+
+    :Input:
+        profiler: The StageProfiler, or None
+        name: Name of the stage
+        rows: Number of rows processed by the stage
+        passes: Number of passes the stage makes over the rows
+
+    :Return:
+        context manager: The context manager to run the stage in
+
+    :Time Complexity: O(1)
+    :Aux Space Complexity: O(1)
+    """
+    if profiler is None:
+        return NO_PROFILER
+    return profiler.stage(name, rows, passes)
+
+
 def add_reverse(lst: list) -> None:
     """
     Function to switch the format of matches.
@@ -134,6 +383,78 @@ def counting_sort_string(string: str, roster: int) -> str:
     return "".join(chars_to_join)  # O(M)
 
 
+class CanonicalTeamCache:
+    """
+    Bounded cache of the sorted (canonical) form of team strings, so that a team that appears
+    in many matches is only sorted by counting_sort_string once. When the cache is full, the
+    least recently used team is evicted.
+
+    :Attributes:
+        max_size: Maximum number of teams kept in the cache
+        teams: OrderedDict mapping (team, roster) to the canonical team, from least to most recently used
+        hits: Number of lookups answered from the cache
+        misses: Number of lookups that had to sort the team
+    """
+
+    def __init__(self, max_size: int = 65536) -> None:
+        """
+        Creates an empty cache.
+
+        :Input:
+            max_size: Maximum number of teams kept in the cache
+
+        :Time Complexity: O(1)
+        :Aux Space Complexity: O(1)
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be positive")
+        self.max_size = max_size
+        self.teams = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def canonical(self, team: str, roster: int) -> str:
+        """
+        Returns team with its characters sorted, as counting_sort_string does.
+
+        :Input:
+            team: The team string
+            roster: Positive integer to denote the character set used in team
+
+        :Return:
+            str: The canonical team
+
+        :Time Complexity: O(M) for a team that is not cached, O(1) for a cached team (besides hashing),
+            where M is the number of characters in team
+        :Aux Space Complexity: O(M), where M is the number of characters in team
+        """
+        key = (team, roster)
+        canonical = self.teams.get(key)
+
+        # Found: mark the team as the most recently used
+        if canonical is not None:
+            self.teams.move_to_end(key)
+            self.hits += 1
+            return canonical
+
+        # Not found: sort the team and evict the least recently used team if the cache is full
+        self.misses += 1
+        canonical = counting_sort_string(team, roster)
+        self.teams[key] = canonical
+        if len(self.teams) > self.max_size:
+            self.teams.popitem(last=False)
+        return canonical
+
+    def __len__(self) -> int:
+        """
+        Returns the number of teams in the cache.
+
+        :Time Complexity: O(1)
+        :Aux Space Complexity: O(1)
+        """
+        return len(self.teams)
+
+
 def radix_sort_team(lst: list, roster: int, team_num: int) -> list:
     """
     Function to sort one of the teams inside the results list in ascending lexicographical order
@@ -226,7 +547,7 @@ def counting_sort_team(lst: list, roster: int, char_place: int, team_num: int) -
     return output
 
 
-def radix_sort_score(lst: list) -> list:
+def radix_sort_score(lst: list, score_index: list = None, compact: bool = False) -> list:
     """
     Function to sort the score inside the results list in decreasing order
     using radix sort algorithm.
@@ -234,6 +555,13 @@ def radix_sort_score(lst: list) -> list:
     :Input:
         lst:
             The results list to be sorted
+        score_index:
+            Optional list of 101 [start, end] pairs. If it is given, score_index[s] is set to the
+            positions where the matches with score s start and end (exclusive) in the sorted list.
+        compact:
+            If True, lst must already be sorted by team1 and team2, and duplicate matches are left
+            out of the last counting sort pass, so the sorted list only holds unique matches and
+            filter_duplicates is not needed.
 
     :Return:
         lst: The results list that has been sorted
@@ -244,13 +572,17 @@ def radix_sort_score(lst: list) -> list:
     # Call counting_sort_score 3 times, looking at one digit at a time starting from the least significant digit
     digit_place = 0
     for i in range(3):  # O(1) * O(N) = O(N)
-        lst = counting_sort_score(lst, digit_place)
+        lst = counting_sort_score(lst, digit_place, compact and digit_place == 2)
         digit_place += 1
 
+    # Count every score to build the score index
+    if score_index is not None:
+        fill_score_index(lst, score_index)  # O(N)
+
     return lst
 
 
-def counting_sort_score(lst: list, digit_place: int) -> list:
+def counting_sort_score(lst: list, digit_place: int, compact: bool = False) -> list:
     """
     Function to sort a specified digit place in descending order
     using counting sort algorithm
@@ -260,6 +592,10 @@ def counting_sort_score(lst: list, digit_place: int) -> list:
             The results list to be sorted
         digit_place:
             Integer to denote which digit place we are sorting on
+        compact:
+            If True, a match equal to the last match placed in the same digit bucket is left out.
+            On the last pass of radix_sort_score equal matches meet in the same bucket one after
+            another, so this removes every duplicate.
 
     :Return:
         lst: The results list that has been sorted
@@ -270,9 +606,16 @@ def counting_sort_score(lst: list, digit_place: int) -> list:
     # Create count array
     count = [0 for i in range(10)]  # O(1)
 
+    # Create array of the last match counted for every digit, used to skip duplicates
+    last = [None for i in range(10)]  # O(1)
+
     # Go through each value in lst and increment count[digit_processed] by 1
     for i in range(len(lst)):  # O(N)
         digit_processed = (lst[i][2] // (10 ** digit_place)) % 10
+        if compact:
+            if last[digit_processed] is not None and last[digit_processed] == lst[i]:
+                continue
+            last[digit_processed] = lst[i]
         count[digit_processed] += 1
 
     # Create position array
@@ -282,12 +625,17 @@ def counting_sort_score(lst: list, digit_place: int) -> list:
     for i in range(8, -1, -1):  # O(1)
         position[i] = position[i + 1] + count[i + 1]
 
-    # Create output array
-    output = [0 for i in range(len(lst))]  # O(N)
+    # Create output array, which only has room for the matches that were counted
+    output = [0 for i in range(position[0] + count[0])]  # O(N)
+    last = [None for i in range(10)]  # O(1)
 
     # Go through each value in lst and set output[position[digit_processed]] = lst[i]
     for i in range(len(lst)):  # O(N)
         digit_processed = (lst[i][2] // (10 ** digit_place)) % 10
+        if compact:
+            if last[digit_processed] is not None and last[digit_processed] == lst[i]:
+                continue
+            last[digit_processed] = lst[i]
         output[position[digit_processed]] = lst[i]
 
         # Increment position[value]
@@ -299,6 +647,8 @@ def counting_sort_score(lst: list, digit_place: int) -> list:
 def filter_duplicates(lst: list) -> None:
     """
     Function to delete any duplicate matches, meaning matches that have the same team1, team2, and score.
+    analyze no longer calls it, as radix_sort_score with compact=True leaves duplicates out without
+    None tombstones; it is kept only as part of the public API of the original module.
 
     :Input:
         lst: The results list to be filtered
@@ -316,6 +666,8 @@ def filter_duplicates(lst: list) -> None:
 def find_searchedmatches(lst: list, score: int, searchedmatches: list) -> None:
     """
     Function that goes through the sorted lst to find a match with the score that is passed.
+    analyze no longer calls it, as it answers searches with search_score_index; it is kept only
+    as part of the public API of the original module.
 
     :Input:
         lst: Past tournament data represented as a list of lists that has been sorted by score
@@ -360,5 +712,2394 @@ def find_searchedmatches(lst: list, score: int, searchedmatches: list) -> None:
                 searchedmatches.append(lst[i])
 
 
-results = [['A', 'B', 1], ['B', 'A', 99]]
-print(analyze(results, 26, 0))
+def analyze_numpy(results: list, roster: int, score: int) -> list:
+    """
+    Performs the same analysis as analyze, but runs every counting sort pass as a vectorized
+    NumPy operation over fixed-width uint8 code arrays instead of walking Python lists.
+    NumPy is only imported when this engine is used.
+
+    :Input:
+        results:
+            Past tournament data represented as a list of lists [team1, team2, score].
+            The list is not modified.
+        roster:
+            Positive integer to denote the character set used in team1 and team2.
+        score:
+            The score we want to search for and return in searchedmatches.
+
+    :Return:
+        lst: List of findings denoted as [top10matches, searchedmatches], identical to analyze
+
+    :Time Complexity: O(N * M), where N is the length of results and M is the number of characters in each team
+    :Aux Space Complexity: O(N * M), where N is the length of results and M is the number of characters in each team
+    """
+    import numpy as np
+
+    # Nothing to sort, so there is nothing to find either
+    if len(results) == 0:
+        return [[], []]
+
+    # Encode both teams as (N, M) code arrays and the scores as a uint8 column
+    team1 = encode_teams_numpy([match[0] for match in results], roster)
+    team2 = encode_teams_numpy([match[1] for match in results], roster)
+    scores = np.fromiter((match[2] for match in results), dtype=np.uint8, count=len(results))
+
+    # Sort the characters of every team, which is what counting_sort_string does for one team
+    team1.sort(axis=1)
+    team2.sort(axis=1)
+
+    # Add the reverse format of every match below the original matches
+    team1, team2 = np.concatenate((team1, team2)), np.concatenate((team2, team1))
+    scores = np.concatenate((scores, 100 - scores))
+
+    # Start from the identity permutation and refine it with one counting sort pass per column
+    perm = np.arange(len(scores))
+
+    # Sort team2 and then team1 in lexicographical order, starting from the last character
+    for team in (team2, team1):
+        for char_place in range(team.shape[1] - 1, -1, -1):  # O(M) * O(N)
+            perm = counting_sort_numpy(perm, team[:, char_place])
+
+    # Sort score in descending order with a single pass over 101 buckets
+    perm = counting_sort_numpy(perm, 100 - scores)
+
+    team1, team2, scores = team1[perm], team2[perm], scores[perm]
+
+    # Filter duplicate matches by keeping only the last match of every run of equal matches
+    keep = np.ones(len(scores), dtype=bool)
+    keep[:-1] = (team1[:-1] != team1[1:]).any(axis=1) | (team2[:-1] != team2[1:]).any(axis=1) | \
+                (scores[:-1] != scores[1:])
+    team1, team2, scores = team1[keep], team2[keep], scores[keep]
+
+    # Grab top 10 highest matches from sorted results
+    top10matches = [decode_match_numpy(team1, team2, scores, i) for i in range(min(10, len(scores)))]
+
+    # Look for the lowest score that is at least score; scores are in descending order
+    searchedmatches = []
+    candidates = np.flatnonzero(scores >= score)
+    if len(candidates) > 0:
+        # The matches with that score sit next to each other
+        same = np.flatnonzero(scores == scores[candidates[-1]])
+        searchedmatches = [decode_match_numpy(team1, team2, scores, i) for i in range(same[0], same[-1] + 1)]
+
+    return [top10matches, searchedmatches]
+
+
+def encode_teams_numpy(teams: list, roster: int):
+    """
+    Function to encode a list of equal length team strings as a (N, M) uint8 array of
+    character codes, where A is 0, B is 1, and so on.
+
+    :Input:
+        teams: List of uppercase team strings, all of the same length
+        roster: Positive integer to denote the character set used in the teams
+
+    :Return:
+        codes: NumPy array of shape (N, M) holding the character codes
+
+    :Time Complexity: O(N * M), where N is the length of teams and M is the number of characters in each team
+    :Aux Space Complexity: O(N * M), where N is the length of teams and M is the number of characters in each team
+    """
+    import numpy as np
+
+    # Every team has to have the same number of characters to fit in a fixed-width array
+    width = len(teams[0])
+    for team in teams:  # O(N)
+        if len(team) != width:
+            raise ValueError("All teams must have the same number of characters")
+
+    # Join the teams into one buffer and view it as rows of character codes
+    codes = np.frombuffer("".join(teams).encode("ascii"), dtype=np.uint8).reshape(len(teams), width) - 65
+
+    # Make sure every character is part of the roster
+    if codes.size > 0 and codes.max() >= roster:
+        raise ValueError("Team contains a character outside of the roster")
+
+    return codes
+
+
+def counting_sort_numpy(perm, keys):
+    """
+    Function to perform one stable counting sort pass on a permutation of rows.
+    NumPy sorts 8-bit keys with a stable counting (radix) sort, so one call does the
+    count, position and output loops of counting_sort_team in compiled code.
+
+    :Input:
+        perm: Array of row indices in their current order
+        keys: Array of small non-negative integer keys, one per row (indexed by row, not by position)
+
+    :Return:
+        perm: Array of row indices stably sorted by their keys
+
+    :Time Complexity: O(N), where N is the length of perm
+    :Aux Space Complexity: O(N), where N is the length of perm
+    """
+    import numpy as np
+
+    return perm[np.argsort(keys[perm], kind="stable")]
+
+
+def decode_match_numpy(team1, team2, scores, i: int) -> list:
+    """
+    Function to turn row i of the encoded arrays back into a [team1, team2, score] list.
+
+    :Input:
+        team1: (N, M) array of team1 character codes
+        team2: (N, M) array of team2 character codes
+        scores: Array of scores
+        i: Index of the row to decode
+
+    :Return:
+        match: The match as [team1, team2, score]
+
+    :Time Complexity: O(M), where M is the number of characters in each team
+    :Aux Space Complexity: O(M), where M is the number of characters in each team
+    """
+    return [(team1[i] + 65).tobytes().decode("ascii"), (team2[i] + 65).tobytes().decode("ascii"), int(scores[i])]
+
+
+def analyze_packed(results: list, roster: int, score: int) -> list:
+    """
+    Performs the same analysis as analyze, but packs every match into one integer key
+    (100-score, team1, team2) and sorts the keys with a wide-digit radix sort. A team is a sorted
+    string over the roster, so it can be read as a base-roster number with M digits.
+
+    :Input:
+        results:
+            Past tournament data represented as a list of lists [team1, team2, score].
+            The list is not modified.
+        roster:
+            Positive integer to denote the character set used in team1 and team2.
+        score:
+            The score we want to search for and return in searchedmatches.
+
+    :Return:
+        lst: List of findings denoted as [top10matches, searchedmatches], identical to analyze
+
+    :Time Complexity: O(N * M + N * K), where N is the length of results, M is the number of characters
+        in each team and K is the number of 16-bit digits in a key (K = O(M * log(roster) / 16))
+    :Aux Space Complexity: O(N + B), where N is the length of results and B = 2^16 is the number of buckets
+    """
+    # Nothing to sort, so there is nothing to find either
+    if len(results) == 0:
+        return [[], []]
+
+    # Every team has to have the same number of characters for the keys to be comparable
+    width = len(results[0][0])
+    team_range = roster ** width
+
+    # Build the canonical matches and their reverse format together with their keys
+    matches = []
+    keys = []
+    for match in results:  # O(N) * O(M)
+        team1 = counting_sort_string(match[0], roster)
+        team2 = counting_sort_string(match[1], roster)
+        if len(team1) != width or len(team2) != width:
+            raise ValueError("All teams must have the same number of characters")
+        code1 = pack_team(team1, roster)
+        code2 = pack_team(team2, roster)
+
+        matches.append([team1, team2, match[2]])
+        keys.append(((100 - match[2]) * team_range + code1) * team_range + code2)
+        matches.append([team2, team1, 100 - match[2]])
+        keys.append((match[2] * team_range + code2) * team_range + code1)
+
+    # Sort by the packed keys, which orders by score descending, then team1, then team2
+    keys, matches = radix_sort_packed(keys, matches)
+
+    # Filter duplicate matches; equal keys mean equal matches, so keep the first of every run
+    unique = [matches[0]]
+    for i in range(1, len(keys)):  # O(N)
+        if keys[i] != keys[i - 1]:
+            unique.append(matches[i])
+
+    # Grab top 10 highest matches from sorted results
+    top10matches = unique[:10]
+
+    # Look for searchedmatches using the score index
+    score_index = [[0, 0] for i in range(101)]
+    fill_score_index(unique, score_index)
+
+    return [top10matches, search_score_index(unique, score_index, score)]
+
+
+def pack_team(team: str, roster: int) -> int:
+    """
+    Function to read a team string as a base-roster number, where A is the digit 0.
+
+    :Input:
+        team: The team string
+        roster: Positive integer to denote the character set used in team
+
+    :Return:
+        int: The packed value of team
+
+    :Time Complexity: O(M), where M is the number of characters in team
+    :Aux Space Complexity: O(1)
+    """
+    value = 0
+    for i in range(len(team)):  # O(M)
+        value = value * roster + ord(team[i]) - 65
+    return value
+
+
+def radix_sort_packed(keys: list, lst: list, digit_bits: int = 16) -> tuple:
+    """
+    Function to sort non-negative integer keys in ascending order using radix sort with
+    2^digit_bits buckets per pass, moving the items of lst along with their keys.
+
+    :Input:
+        keys: List of non-negative integer keys
+        lst: List of items, where lst[i] belongs to keys[i]
+        digit_bits: Number of key bits looked at in each counting sort pass
+
+    :Return:
+        tuple: (keys, lst) with both lists in sorted key order
+
+    :Time Complexity: O(K * (N + B)), where N is the length of keys, K is the number of digits
+        in the largest key and B = 2^digit_bits is the number of buckets
+    :Aux Space Complexity: O(N + B), where N is the length of keys and B = 2^digit_bits
+    """
+    # Determine the number of passes needed for the largest key
+    largest = 0
+    for key in keys:  # O(N)
+        if key > largest:
+            largest = key
+    num_passes = (largest.bit_length() + digit_bits - 1) // digit_bits
+
+    # Call counting_sort_packed once per digit, starting from the least significant digit
+    shift = 0
+    for _ in range(num_passes):  # O(K) * O(N + B)
+        keys, lst = counting_sort_packed(keys, lst, shift, digit_bits)
+        shift += digit_bits
+
+    return keys, lst
+
+
+def counting_sort_packed(keys: list, lst: list, shift: int, digit_bits: int) -> tuple:
+    """
+    Function to stably sort keys (and the items of lst with them) on the digit found
+    at bit position shift, using counting sort algorithm.
+
+    :Input:
+        keys: List of non-negative integer keys
+        lst: List of items, where lst[i] belongs to keys[i]
+        shift: Bit position of the digit we are sorting on
+        digit_bits: Number of bits in the digit
+
+    :Return:
+        tuple: (keys, lst) with both lists sorted on the digit
+
+    :Time Complexity: O(N + B), where N is the length of keys and B = 2^digit_bits
+    :Aux Space Complexity: O(N + B), where N is the length of keys and B = 2^digit_bits
+    """
+    num_buckets = 1 << digit_bits
+    mask = num_buckets - 1
+
+    # Create count array and count each digit
+    count = [0 for i in range(num_buckets)]  # O(B)
+    for key in keys:  # O(N)
+        count[(key >> shift) & mask] += 1
+
+    # Turn count into the starting position of every digit
+    position = 0
+    for i in range(num_buckets):  # O(B)
+        count[i], position = position, position + count[i]
+
+    # Create output arrays and place every key at its position
+    output_keys = [0 for i in range(len(keys))]  # O(N)
+    output = [0 for i in range(len(keys))]  # O(N)
+    for i in range(len(keys)):  # O(N)
+        digit = (keys[i] >> shift) & mask
+        output_keys[count[digit]] = keys[i]
+        output[count[digit]] = lst[i]
+        count[digit] += 1
+
+    return output_keys, output
+
+
+def fill_score_index(lst: list, score_index: list) -> None:
+    """
+    Function to fill in the score index of a list of matches that is (or will be) sorted
+    by score in descending order. The matches with score s start after all the matches
+    with a higher score.
+
+    :Input:
+        lst: The results list, which must not contain None
+        score_index: List of 101 [start, end] pairs; score_index[s] is set to the positions
+            where the matches with score s start and end (exclusive)
+
+    :Time Complexity: O(N), where N is the length of lst
+    :Aux Space Complexity: O(1)
+    """
+    count = [0 for i in range(101)]  # O(1)
+    for i in range(len(lst)):  # O(N)
+        count[lst[i][2]] += 1
+
+    position = 0
+    for s in range(100, -1, -1):  # O(1)
+        score_index[s][0] = position
+        position += count[s]
+        score_index[s][1] = position
+
+
+def search_score_index(lst: list, score_index: list, score: int) -> list:
+    """
+    Function to find the matches with the score that is passed, or with the next highest score
+    if there are none, by slicing the sorted lst with its score index.
+
+    :Input:
+        lst: The results list sorted by radix_sort_score with compact=True
+        score_index: The score index filled in by radix_sort_score
+        score: The score we want to search for
+
+    :Return:
+        searchedmatches: List of matches with the score, in sorted order
+
+    :Time Complexity: O(K), where K is the number of matches with the score that is found
+    :Aux Space Complexity: O(K), where K is the number of matches with the score that is found
+    """
+    found_score = next_score(score_index, score)
+    if found_score is None:
+        return []
+
+    # Slice the matches of that score
+    start, end = score_index[found_score]
+    return lst[start:end]
+
+
+def next_score(score_index: list, score: int):
+    """
+    Function to find the lowest score that is at least the score passed and has matches.
+
+    :Input:
+        score_index: The score index filled in by radix_sort_score
+        score: The score we want to search for
+
+    :Return:
+        int: The score that was found, or None if there are no matches with a score of at least score
+
+    :Time Complexity: O(1), as there are only 101 scores
+    :Aux Space Complexity: O(1)
+    """
+    for s in range(max(score, 0), 101):  # O(1)
+        if score_index[s][1] > score_index[s][0]:
+            return s
+    return None
+
+
+def top_k_matches(results: list, roster: int, k: int = 10) -> list:
+    """
+    Function to find the k matches with the highest score without sorting all of results.
+    The score of every match is counted first to find the lowest score that can still make it
+    into the top k, and only the matches with a score of at least that cutoff are sorted.
+
+    :Input:
+        results:
+            Past tournament data represented as a list of lists [team1, team2, score].
+            The list is not modified.
+        roster:
+            Positive integer to denote the character set used in team1 and team2.
+        k:
+            Number of matches to return.
+
+    :Return:
+        topkmatches: List of up to k matches, in the same order as top10matches in analyze
+
+    :Time Complexity: O(N + C * M), where N is the length of results, C is the number of matches with a score
+        of at least the cutoff and M is the number of characters in each team
+    :Aux Space Complexity: O(C * M), where C is the number of matches with a score of at least the cutoff
+        and M is the number of characters in each team
+    """
+    # Count the scores of the matches and their reverse format
+    count = [0 for i in range(101)]
+    for match in results:  # O(N)
+        count[match[2]] += 1
+        count[100 - match[2]] += 1
+
+    topkmatches = []
+    high = 101
+
+    # Duplicates can leave us short of k matches, in which case we move on to the next lower scores
+    while len(topkmatches) < k and high > 0:
+        # Go down from the highest score until the buckets hold enough matches
+        cutoff = high
+        total = 0
+        while cutoff > 0 and total < k - len(topkmatches):  # O(1)
+            cutoff -= 1
+            total += count[cutoff]
+
+        # Sort only the matches with a score between cutoff and high
+        lst = canonical_matches(results, roster, cutoff, high)  # O(N + C * M)
+        lst = radix_sort_team(lst, roster, 1)
+        lst = radix_sort_team(lst, roster, 0)
+        lst = radix_sort_score(lst, compact=True)
+
+        # Take the unique matches until we have k of them
+        topkmatches.extend(lst[:k - len(topkmatches)])
+
+        high = cutoff
+
+    return topkmatches
+
+
+def canonical_matches(results: list, roster: int, low: int = 0, high: int = 101,
+                      cache: "CanonicalTeamCache" = None) -> list:
+    """
+    Function to build the canonical format of the matches and their reverse format, keeping
+    only those with a score from low (inclusive) to high (exclusive).
+
+    :Input:
+        results: The results list, which is not modified
+        roster: Positive integer to denote the character set used in team1 and team2
+        low: Lowest score to keep
+        high: One more than the highest score to keep
+        cache: Optional CanonicalTeamCache used to look up the sorted form of every team
+
+    :Return:
+        lst: List of new matches [team1, team2, score] with the characters of both teams sorted
+
+    :Time Complexity: O(N + C * M), where N is the length of results, C is the number of matches kept
+        and M is the number of characters in each team
+    :Aux Space Complexity: O(C * M), where C is the number of matches kept and M is the number of characters
+        in each team
+    """
+    canonical = counting_sort_string if cache is None else cache.canonical
+
+    lst = []
+    for match in results:  # O(N)
+        if low <= match[2] < high:
+            lst.append([canonical(match[0], roster), canonical(match[1], roster), match[2]])
+        if low <= 100 - match[2] < high:
+            lst.append([canonical(match[1], roster), canonical(match[0], roster), 100 - match[2]])
+    return lst
+
+
+def analyze_many(results: list, roster: int, scores: list) -> list:
+    """
+    Performs the analysis of analyze for several scores at once, sharing one sort of results
+    between all of them.
+
+    :Input:
+        results:
+            Past tournament data represented as a list of lists [team1, team2, score].
+            The list is not modified.
+        roster:
+            Positive integer to denote the character set used in team1 and team2.
+        scores:
+            List of the scores we want to search for.
+
+    :Return:
+        lst: List with one [top10matches, searchedmatches] entry per score in scores
+
+    :Time Complexity: O(N * M + S * K), where N is the length of results, M is the number of characters
+        in each team, S is the length of scores and K is the size of the largest searchedmatches
+    :Aux Space Complexity: O(N * M), where N is the length of results and M is the number of characters in each team
+    """
+    prepared = PreparedResults(results, roster)
+    return [[prepared.top10(), prepared.search(score)] for score in scores]
+
+
+def analyze_parallel(results: list, roster: int, score: int, workers: int = None) -> list:
+    """
+    Performs the analysis of analyze with the sorting spread over a pool of worker processes.
+    results is split into one shard per worker, every shard is canonicalised, sorted and
+    de-duplicated by sort_shard, and the sorted shards are merged by score (descending),
+    team1 and team2, dropping the duplicates that appear in more than one shard.
+
+    :Input:
+        results:
+            Past tournament data represented as a list of lists [team1, team2, score].
+            The list is not modified.
+        roster:
+            Positive integer to denote the character set used in team1 and team2.
+        score:
+            The score we want to search for and return in searchedmatches.
+        workers:
+            Number of worker processes, defaults to the number of CPUs. Must be positive.
+            With 1 worker the shard is sorted in the calling process.
+
+    :Return:
+        lst: List of findings denoted as [top10matches, searchedmatches], identical to analyze
+
+    :Time Complexity: O(N * M / W + N * M * log(W)), where N is the length of results, M is the number of
+        characters in each team and W is the number of workers
+    :Aux Space Complexity: O(N * M), where N is the length of results and M is the number of characters in each team
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Split results into one contiguous shard per worker
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be positive")
+    shard_size = max(1, -(-len(results) // workers))
+    shards = [results[i:i + shard_size] for i in range(0, len(results), shard_size)]
+
+    # Sort every shard, in worker processes if there is more than one shard
+    if len(shards) <= 1 or workers == 1:
+        sorted_shards = [sort_shard(shard, roster) for shard in shards]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            sorted_shards = list(executor.map(sort_shard, shards, [roster] * len(shards)))
+
+    # Merge the sorted shards; equal matches end up next to each other, so keep only the first
+    merged = merge_sorted_matches(sorted_shards)
+
+    # Grab top 10 highest matches and look for searchedmatches using the score index
+    score_index = [[0, 0] for i in range(101)]
+    fill_score_index(merged, score_index)
+    return [merged[:10], search_score_index(merged, score_index, score)]
+
+
+def sort_shard(shard: list, roster: int) -> list:
+    """
+    Function to canonicalise, sort and de-duplicate one shard of results, including the
+    reverse format of its matches. Runs in a worker process of analyze_parallel.
+
+    :Input:
+        shard: Part of the results list, which is not modified
+        roster: Positive integer to denote the character set used in team1 and team2
+
+    :Return:
+        lst: The unique matches of the shard sorted by score (descending), team1 and team2
+
+    :Time Complexity: O(S * M), where S is the length of shard and M is the number of characters in each team
+    :Aux Space Complexity: O(S * M), where S is the length of shard and M is the number of characters in each team
+    """
+    lst = canonical_matches(shard, roster)
+    lst = radix_sort_team(lst, roster, 1)
+    lst = radix_sort_team(lst, roster, 0)
+    return radix_sort_score(lst, compact=True)
+
+
+def merge_sorted_matches(sorted_lists: list) -> list:
+    """
+    Function to merge lists of unique matches that are each sorted by score (descending),
+    team1 and team2 into one sorted list, keeping one copy of matches found in several lists.
+
+    :Input:
+        sorted_lists: List of sorted lists of matches
+
+    :Return:
+        merged: The merged list of unique matches
+
+    :Time Complexity: O(N * M * log(K)), where N is the total number of matches, M is the number of
+        characters in each team and K is the number of lists
+    :Aux Space Complexity: O(N), where N is the total number of matches
+    """
+    merged = []
+    for match in heapq.merge(*sorted_lists, key=lambda match: (-match[2], match[0], match[1])):
+        if len(merged) == 0 or merged[-1] != match:
+            merged.append(match)
+    return merged
+
+
+def merge_new_matches(sorted_matches: list, batch: list, roster: int) -> list:
+    """
+    Function to merge a batch of new matches into results that are already sorted and de-duplicated,
+    without sorting the old results again. Only the batch (with its reverse format) is canonicalised
+    and sorted, and the two sorted lists are then merged in one linear pass.
+
+    :Input:
+        sorted_matches: Unique matches sorted by score (descending), team1 and team2; it is not modified
+        batch: New matches [team1, team2, score], which are not modified
+        roster: Positive integer to denote the character set used in team1 and team2
+
+    :Return:
+        merged: The sorted list of the unique matches of both
+
+    :Time Complexity: O(N + B * M), where N is the length of sorted_matches, B is the length of batch
+        and M is the number of characters in each team
+    :Aux Space Complexity: O(N + B * M), where N is the length of sorted_matches, B is the length of batch
+        and M is the number of characters in each team
+    """
+    new_matches = sort_shard(batch, roster)  # O(B * M)
+    merged = []
+
+    def append(match):
+        # Equal matches meet next to each other, so only keep one of them
+        if len(merged) == 0 or merged[-1] != match:
+            merged.append(match)
+
+    # Take the smaller of the two front matches until one of the lists runs out
+    i = 0
+    j = 0
+    while i < len(sorted_matches) and j < len(new_matches):  # O(N + B)
+        if (-sorted_matches[i][2], sorted_matches[i][0], sorted_matches[i][1]) <= \
+                (-new_matches[j][2], new_matches[j][0], new_matches[j][1]):
+            append(sorted_matches[i])
+            i += 1
+        else:
+            append(new_matches[j])
+            j += 1
+
+    # Copy whatever is left
+    for k in range(i, len(sorted_matches)):
+        append(sorted_matches[k])
+    for k in range(j, len(new_matches)):
+        append(new_matches[k])
+
+    return merged
+
+
+class PreparedResults:
+    """
+    Sorted and de-duplicated tournament results that can answer any number of top 10 and
+    score searches without sorting again.
+
+    :Attributes:
+        roster: Positive integer to denote the character set used in the teams
+        matches: The sorted list of unique matches
+        score_index: The score index of matches, as filled in by radix_sort_score
+    """
+
+    def __init__(self, results: list, roster: int, cache: "CanonicalTeamCache" = None) -> None:
+        """
+        Sorts results once, the same way analyze does, without modifying results.
+
+        :Input:
+            results: Past tournament data represented as a list of lists [team1, team2, score]
+            roster: Positive integer to denote the character set used in team1 and team2
+            cache: Optional CanonicalTeamCache used to look up the sorted form of every team
+
+        :Time Complexity: O(N * M), where N is the length of results and M is the number of characters in each team
+        :Aux Space Complexity: O(N * M), where N is the length of results and M is the number of characters
+            in each team
+        """
+        self.roster = roster
+
+        # Build the canonical matches together with their reverse format
+        lst = canonical_matches(results, roster, cache=cache)  # O(N) * O(M)
+
+        # Sort by team2, then team1, then score in descending order
+        lst = radix_sort_team(lst, roster, 1)  # O(M) * (N)
+        lst = radix_sort_team(lst, roster, 0)  # O(M) * (N)
+        # Leave out duplicate matches in the last score pass
+        self.score_index = [[0, 0] for i in range(101)]
+        self.matches = radix_sort_score(lst, self.score_index, compact=True)  # O(N)
+
+    @classmethod
+    def from_sorted(cls, matches: list, roster: int) -> "PreparedResults":
+        """
+        Creates prepared results from matches that are already sorted and de-duplicated, without sorting.
+
+        :Input:
+            matches: Unique canonical matches sorted by score (descending), team1 and team2
+            roster: Positive integer to denote the character set used in the teams
+
+        :Return:
+            prepared: The new PreparedResults, which keeps matches as it is
+
+        :Time Complexity: O(N), where N is the length of matches
+        :Aux Space Complexity: O(1)
+        """
+        prepared = cls.__new__(cls)
+        prepared.roster = roster
+        prepared.matches = matches
+        prepared.score_index = [[0, 0] for i in range(101)]
+        fill_score_index(matches, prepared.score_index)
+        return prepared
+
+    def with_matches(self, batch: list) -> "PreparedResults":
+        """
+        Returns new prepared results that also hold a batch of new matches, merged in with
+        merge_new_matches so the old results are not sorted again. Neither these prepared results
+        (which may be shared, for example by AnalysisService) nor batch are modified.
+
+        :Input:
+            batch: New matches [team1, team2, score]
+
+        :Return:
+            prepared: The new PreparedResults
+
+        :Time Complexity: O(N + B * M), where N is the number of sorted matches, B is the length of batch
+            and M is the number of characters in each team
+        :Aux Space Complexity: O(N + B * M), where N is the number of sorted matches, B is the length of batch
+            and M is the number of characters in each team
+        """
+        return PreparedResults.from_sorted(merge_new_matches(self.matches, batch, self.roster), self.roster)
+
+    def top(self, k: int) -> list:
+        """
+        Returns the k matches with the highest score.
+
+        :Input:
+            k: Number of matches to return
+
+        :Return:
+            lst: List of up to k matches [team1, team2, score]
+
+        :Time Complexity: O(k)
+        :Aux Space Complexity: O(k)
+        """
+        return [list(match) for match in self.matches[:k]]
+
+    def top10(self) -> list:
+        """
+        Returns the 10 matches with the highest score, as top10matches in analyze.
+
+        :Return:
+            top10matches: List of up to 10 matches [team1, team2, score]
+
+        :Time Complexity: O(1)
+        :Aux Space Complexity: O(1)
+        """
+        return self.top(10)
+
+    def search(self, score: int) -> list:
+        """
+        Returns the matches with the given score, or with the next highest score if there are
+        none, as searchedmatches in analyze.
+
+        :Input:
+            score: The score we want to search for
+
+        :Return:
+            searchedmatches: List of matches [team1, team2, score]
+
+        :Time Complexity: O(K), where K is the number of matches with the score that is found
+        :Aux Space Complexity: O(K), where K is the number of matches with the score that is found
+        """
+        return [list(match) for match in search_score_index(self.matches, self.score_index, score)]
+
+
+def analyze_hashed(results: list, roster: int, score: int) -> list:
+    """
+    Performs the analysis of analyze without sorting all of results. Duplicate matches are removed
+    by hashing their canonical (team1, team2) pair into the set of their score, and only the score
+    buckets that end up in the output (the highest buckets for top10matches and the searched bucket)
+    are radix sorted by team.
+
+    :Input:
+        results:
+            Past tournament data represented as a list of lists [team1, team2, score].
+            The list is not modified.
+        roster:
+            Positive integer to denote the character set used in team1 and team2.
+        score:
+            The score we want to search for and return in searchedmatches.
+
+    :Return:
+        lst: List of findings denoted as [top10matches, searchedmatches], identical to analyze
+
+    :Time Complexity: O(N * M + K * M), where N is the length of results, M is the number of characters in each
+        team and K is the number of unique matches in the buckets that are returned
+    :Aux Space Complexity: O(U * M), where U is the number of unique matches and M is the number of characters
+        in each team
+    """
+    analyzer = IncrementalAnalyzer(roster)
+    analyzer.add_matches(results)
+    return [analyzer.top10(), analyzer.search(score)]
+
+
+def analyze_stream(matches, roster: int, score: int, batch_size: int = 4096) -> list:
+    """
+    Performs the analysis of analyze on any iterable or generator of matches. The matches are
+    canonicalised and put into their score bucket as they come in, so reading the input overlaps
+    with the analysis and the caller's data is never modified or copied as a whole.
+
+    :Input:
+        matches:
+            Iterable of matches [team1, team2, score], which are not modified.
+        roster:
+            Positive integer to denote the character set used in team1 and team2.
+        score:
+            The score we want to search for and return in searchedmatches.
+        batch_size:
+            Maximum number of matches taken from matches at a time.
+
+    :Return:
+        lst: List of findings denoted as [top10matches, searchedmatches], identical to analyze
+
+    :Time Complexity: O(N * M), where N is the number of matches and M is the number of characters in each team
+    :Aux Space Complexity: O(B + U * M), where B is batch_size, U is the number of unique matches
+        and M is the number of characters in each team
+    """
+    analyzer = IncrementalAnalyzer(roster)
+    analyzer.add_stream(matches, batch_size)
+    return [analyzer.top10(), analyzer.search(score)]
+
+
+def dataset_fingerprint(results: list) -> str:
+    """
+    Function to compute a fingerprint of tournament results, so that two lists holding the same
+    matches in the same order get the same fingerprint.
+
+    :Input:
+        results: Past tournament data represented as a list of lists [team1, team2, score]
+
+    :Return:
+        str: Hexadecimal BLAKE2b digest of the matches
+
+    :Time Complexity: O(N * M), where N is the length of results and M is the number of characters in each team
+    :Aux Space Complexity: O(M), where M is the number of characters in each team
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    for match in results:  # O(N)
+        digest.update((match[0] + "," + match[1] + "," + str(match[2]) + "\n").encode("ascii"))
+    return digest.hexdigest()
+
+
+class AnalysisService:
+    """
+    Asyncio service layer around PreparedResults. Sorting runs in an executor so the event loop stays
+    responsive, identical requests that arrive while a sort is running wait for that sort instead of
+    starting their own, and sorted results are kept in a size-bounded LRU cache so that later score
+    searches on the same results are answered from memory.
+
+    :Attributes:
+        max_entries: Maximum number of sorted results kept in the cache
+        executor: Executor the sorts run in, or None for the event loop's default executor
+        cache: OrderedDict mapping (fingerprint, roster) to PreparedResults, from least to most recently used
+        in_flight: Dict mapping (fingerprint, roster) to the future of a sort that is still running
+        hits: Number of requests answered from the cache
+        coalesced: Number of requests that waited for a sort started by another request
+        misses: Number of requests that started a sort
+    """
+
+    def __init__(self, max_entries: int = 16, executor=None) -> None:
+        """
+        Creates a service with an empty cache.
+
+        :Input:
+            max_entries: Maximum number of sorted results kept in the cache
+            executor: Executor the sorts run in, or None for the event loop's default executor
+
+        :Time Complexity: O(1)
+        :Aux Space Complexity: O(1)
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = max_entries
+        self.executor = executor
+        self.cache = OrderedDict()
+        self.in_flight = {}
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+
+    async def prepare(self, results: list, roster: int, fingerprint: str = None) -> PreparedResults:
+        """
+        Returns the sorted results for results and roster, sorting them only if they are neither
+        cached nor already being sorted for another request.
+
+        :Input:
+            results: Past tournament data represented as a list of lists [team1, team2, score]
+            roster: Positive integer to denote the character set used in team1 and team2
+            fingerprint:
+                Optional identifier of the results snapshot. If it is not given, dataset_fingerprint is run
+                in the executor so the event loop is not blocked, but every request then pays for hashing
+                results; pass a known snapshot id to answer cache hits from memory alone.
+
+        :Return:
+            prepared: The PreparedResults of results
+
+        :Time Complexity: O(N * M) for the fingerprint (unless it is given) and, on a cache miss, for the sort,
+            where N is the length of results and M is the number of characters in each team
+        :Aux Space Complexity: O(N * M) on a cache miss, where N is the length of results and M is the number
+            of characters in each team
+        """
+        import asyncio
+
+        if fingerprint is None:
+            fingerprint = await asyncio.get_running_loop().run_in_executor(self.executor, dataset_fingerprint,
+                                                                           results)
+        key = (fingerprint, roster)
+
+        # Answer from the cache, marking the entry as the most recently used
+        prepared = self.cache.get(key)
+        if prepared is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return prepared
+
+        # Wait for a sort that is already running, or start one in the executor
+        future = self.in_flight.get(key)
+        if future is None:
+            self.misses += 1
+            future = asyncio.get_running_loop().run_in_executor(self.executor, PreparedResults, results, roster)
+            self.in_flight[key] = future
+            future.add_done_callback(lambda done: self.finish(key, done))
+        else:
+            self.coalesced += 1
+
+        # Shield the sort so that one cancelled request does not cancel it for the others
+        return await asyncio.shield(future)
+
+    def finish(self, key: tuple, future) -> None:
+        """
+        Moves a finished sort from in_flight into the cache, evicting the least recently used
+        entry if the cache is full. Failed sorts are not cached.
+
+        :Input:
+            key: The (fingerprint, roster) key of the sort
+            future: The finished future of the sort
+
+        :Time Complexity: O(1)
+        :Aux Space Complexity: O(1)
+        """
+        self.in_flight.pop(key, None)
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.cache[key] = future.result()
+        if len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+
+    async def analyze(self, results: list, roster: int, score: int, fingerprint: str = None) -> list:
+        """
+        Performs the analysis of analyze, reusing cached or in-flight sorts of the same results.
+        results is not modified.
+
+        :Input:
+            results: Past tournament data represented as a list of lists [team1, team2, score]
+            roster: Positive integer to denote the character set used in team1 and team2
+            score: The score we want to search for and return in searchedmatches
+            fingerprint: Optional identifier of the results snapshot, see prepare
+
+        :Return:
+            lst: List of findings denoted as [top10matches, searchedmatches], identical to analyze
+
+        :Time Complexity: O(K) on a cache hit with a fingerprint given, where K is the size of searchedmatches;
+            otherwise as in prepare, with the hashing and the sort running in the executor
+        :Aux Space Complexity: O(K), where K is the size of searchedmatches, besides the sort on a cache miss
+        """
+        prepared = await self.prepare(results, roster, fingerprint)
+        return [prepared.top10(), prepared.search(score)]
+
+
+class IncrementalAnalyzer:
+    """
+    Analyzer that ingests batches of matches as they arrive instead of re-analyzing the whole
+    history. Canonical, de-duplicated matches are kept in one bucket per score. Every bucket stays
+    sorted; when it is queried after it has changed, only its new matches are sorted and then merged
+    into it.
+
+    :Attributes:
+        roster: Positive integer to denote the character set used in the teams
+        buckets: List of 101 sets, where buckets[s] holds the (team1, team2) pairs with score s
+        sorted_buckets: List of 101 lists, where sorted_buckets[s] holds the matches with score s
+            sorted by team1 and team2, except those still in pending[s]
+        pending: List of 101 lists of the new matches of every bucket that are not merged yet
+    """
+
+    def __init__(self, roster: int) -> None:
+        """
+        Creates an empty analyzer.
+
+        :Input:
+            roster: Positive integer to denote the character set used in the teams
+
+        :Time Complexity: O(1)
+        :Aux Space Complexity: O(1)
+        """
+        self.roster = roster
+        self.buckets = [set() for i in range(101)]
+        self.sorted_buckets = [[] for i in range(101)]
+        self.pending = [[] for i in range(101)]
+
+    def add_matches(self, batch: list) -> None:
+        """
+        Adds a batch of matches, together with their reverse format, to the score buckets.
+        The matches in batch are not modified.
+
+        :Input:
+            batch: List of matches [team1, team2, score]
+
+        :Time Complexity: O(B * M), where B is the length of batch and M is the number of characters in each team
+        :Aux Space Complexity: O(B * M), where B is the length of batch and M is the number of characters
+            in each team
+        """
+        for match in batch:  # O(B) * O(M)
+            team1 = counting_sort_string(match[0], self.roster)
+            team2 = counting_sort_string(match[1], self.roster)
+
+            # Add the match and its reverse format; the sets drop duplicate matches
+            self.add_pair(team1, team2, match[2])
+            self.add_pair(team2, team1, 100 - match[2])
+
+    def add_stream(self, matches, batch_size: int = 4096) -> None:
+        """
+        Adds matches from any iterable, such as a generator reading a CSV file or a socket, taking
+        at most batch_size matches from it at a time.
+
+        :Input:
+            matches: Iterable of matches [team1, team2, score], which are not modified
+            batch_size: Maximum number of matches buffered at once
+
+        :Time Complexity: O(N * M), where N is the number of matches and M is the number of characters in each team
+        :Aux Space Complexity: O(B + U * M), where B is batch_size, U is the number of unique matches
+            and M is the number of characters in each team
+        """
+        iterator = iter(matches)
+        batch = list(islice(iterator, batch_size))
+        while len(batch) > 0:
+            self.add_matches(batch)
+            batch = list(islice(iterator, batch_size))
+
+    def add_pair(self, team1: str, team2: str, score: int) -> None:
+        """
+        Adds one canonical match to the bucket of its score and, if the match is new, to the
+        pending matches of the bucket.
+
+        :Input:
+            team1: Canonical team1 string
+            team2: Canonical team2 string
+            score: Score of the match
+
+        :Time Complexity: O(M), where M is the number of characters in each team
+        :Aux Space Complexity: O(M), where M is the number of characters in each team
+        """
+        bucket = self.buckets[score]
+        if (team1, team2) not in bucket:
+            bucket.add((team1, team2))
+            self.pending[score].append([team1, team2, score])
+
+    def sorted_bucket(self, score: int) -> list:
+        """
+        Returns the matches with the given score sorted by team1 and then team2. Matches added
+        since the bucket was last returned are sorted on their own and merged into it.
+
+        :Input:
+            score: Score of the bucket
+
+        :Return:
+            lst: List of matches [team1, team2, score] in ascending lexicographical order
+
+        :Time Complexity: O(K + P * M) if the bucket changed, otherwise O(1), where K is the size of the bucket,
+            P is the number of pending matches and M is the number of characters in each team
+        :Aux Space Complexity: O(K + P * M), where K is the size of the bucket, P is the number of pending matches
+            and M is the number of characters in each team
+        """
+        if len(self.pending[score]) > 0:
+            # Sort only the new matches, then merge them into the sorted bucket in one linear pass;
+            # the set of the bucket guarantees that no new match is already in it
+            lst = radix_sort_team(self.pending[score], self.roster, 1)  # O(P * M)
+            lst = radix_sort_team(lst, self.roster, 0)  # O(P * M)
+            self.sorted_buckets[score] = list(heapq.merge(self.sorted_buckets[score], lst))  # O(K + P)
+            self.pending[score] = []
+        return self.sorted_buckets[score]
+
+    def top10(self) -> list:
+        """
+        Returns the 10 matches with the highest score, in the same order as analyze.
+
+        :Return:
+            top10matches: List of up to 10 matches [team1, team2, score]
+
+        :Time Complexity: O(K * M), where K is the total size of the buckets that have to be visited
+            and M is the number of characters in each team
+        :Aux Space Complexity: O(K * M), where K is the total size of the buckets that have to be visited
+            and M is the number of characters in each team
+        """
+        top10matches = []
+
+        # Go through the buckets from the highest score until we have 10 matches
+        for score in range(100, -1, -1):  # O(1)
+            for match in self.sorted_bucket(score):
+                if len(top10matches) == 10:
+                    return top10matches
+                top10matches.append(list(match))
+
+        return top10matches
+
+    def search(self, score: int) -> list:
+        """
+        Returns the matches with the given score, or with the next highest score if there are
+        none, in the same order as analyze.
+
+        :Input:
+            score: The score we want to search for
+
+        :Return:
+            searchedmatches: List of matches [team1, team2, score]
+
+        :Time Complexity: O(K * M), where K is the size of the bucket that is returned
+            and M is the number of characters in each team
+        :Aux Space Complexity: O(K * M), where K is the size of the bucket that is returned
+            and M is the number of characters in each team
+        """
+        # Go up from the searched score until we find a score that has matches
+        for bucket_score in range(max(score, 0), 101):  # O(1)
+            if len(self.buckets[bucket_score]) > 0:
+                return [list(match) for match in self.sorted_bucket(bucket_score)]
+
+        return []
+
+
+class MatchTable:
+    """
+    Columnar representation of tournament results. Instead of one [team1, team2, score] list per
+    match, every character place of a team is stored as one byte column, so row i of team1 is
+    team1[0][i], team1[1][i], ..., team1[M-1][i], with A stored as 0, B as 1, and so on.
+
+    :Attributes:
+        roster: Positive integer to denote the character set used in the teams
+        width: Number of characters in each team
+        team1: List of width byte columns holding the character codes of team1
+        team2: List of width byte columns holding the character codes of team2
+        scores: Byte column holding the score of every match
+    """
+
+    def __init__(self, roster: int, width: int, team1: list, team2: list, scores) -> None:
+        """
+        Creates a table from existing columns. A column can be an array('B') or any
+        other bytes-like buffer.
+
+        :Input:
+            roster: Positive integer to denote the character set used in the teams
+            width: Number of characters in each team
+            team1: List of width columns holding the character codes of team1
+            team2: List of width columns holding the character codes of team2
+            scores: Column holding the score of every match
+
+        :Time Complexity: O(1)
+        :Aux Space Complexity: O(1)
+        """
+        self.roster = roster
+        self.width = width
+        self.team1 = team1
+        self.team2 = team2
+        self.scores = scores
+
+    @classmethod
+    def from_results(cls, results: list, roster: int) -> "MatchTable":
+        """
+        Creates a table holding the canonical format of every match in results, meaning that
+        the characters of every team are sorted. results is not modified.
+
+        :Input:
+            results: Past tournament data represented as a list of lists [team1, team2, score]
+            roster: Positive integer to denote the character set used in team1 and team2
+
+        :Return:
+            table: The new MatchTable
+
+        :Time Complexity: O(N * M), where N is the length of results and M is the number of characters in each team
+        :Aux Space Complexity: O(N * M), where N is the length of results and M is the number of characters
+            in each team
+        """
+        width = 0 if len(results) == 0 else len(results[0][0])
+
+        # Sort the characters of every team and check that all teams have the same length
+        teams1 = []
+        teams2 = []
+        for match in results:  # O(N) * O(M)
+            teams1.append(counting_sort_string(match[0], roster))
+            teams2.append(counting_sort_string(match[1], roster))
+            if len(teams1[-1]) != width or len(teams2[-1]) != width:
+                raise ValueError("All teams must have the same number of characters")
+
+        # Join every team into one buffer of codes and cut it into one column per character place
+        codes1 = "".join(teams1).encode("ascii").translate(TO_CODES)
+        codes2 = "".join(teams2).encode("ascii").translate(TO_CODES)
+        team1 = [array("B", codes1[j::width]) for j in range(width)]
+        team2 = [array("B", codes2[j::width]) for j in range(width)]
+
+        return cls(roster, width, team1, team2, array("B", [match[2] for match in results]))
+
+    def __len__(self) -> int:
+        """
+        Returns the number of matches in the table.
+
+        :Time Complexity: O(1)
+        :Aux Space Complexity: O(1)
+        """
+        return len(self.scores)
+
+    def team(self, team_num: int, i: int) -> str:
+        """
+        Returns team1 (team_num 0) or team2 (team_num 1) of row i as a string.
+
+        :Time Complexity: O(M), where M is the number of characters in each team
+        :Aux Space Complexity: O(M), where M is the number of characters in each team
+        """
+        columns = self.team1 if team_num == 0 else self.team2
+        return "".join([chr(column[i] + 65) for column in columns])
+
+    def match(self, i: int) -> list:
+        """
+        Returns row i of the table as a [team1, team2, score] list.
+
+        :Time Complexity: O(M), where M is the number of characters in each team
+        :Aux Space Complexity: O(M), where M is the number of characters in each team
+        """
+        return [self.team(0, i), self.team(1, i), self.scores[i]]
+
+
+def add_reverse_table(table: MatchTable) -> None:
+    """
+    Function to append the reverse format of every match to the columns of table,
+    as add_reverse does for the results list.
+
+    :Input:
+        table: The MatchTable, whose columns have to be array('B')
+
+    :Time Complexity: O(N * M), where N is the number of matches and M is the number of characters in each team
+    :Aux Space Complexity: O(1) besides the columns growing to twice their size
+    """
+    # Copy the columns first so that team1 and team2 get the original values of each other
+    old_team1 = [array("B", column) for column in table.team1]
+    for j in range(table.width):  # O(M) * O(N)
+        table.team1[j].extend(table.team2[j])
+        table.team2[j].extend(old_team1[j])
+    table.scores.extend(array("B", [100 - value for value in table.scores]))
+
+
+def analyze_table(table: MatchTable, score: int, virtual_reverse: bool = False) -> list:
+    """
+    Performs the analysis of analyze on a MatchTable. The sorts only move row numbers around in
+    a permutation array, and only the returned matches are turned back into lists.
+
+    :Input:
+        table: The MatchTable holding the canonical matches
+        score: The score we want to search for and return in searchedmatches
+        virtual_reverse:
+            If False, table must already hold the reverse format of every match (see add_reverse_table).
+            If True, every stored row r is read as two logical rows: 2r is the match itself and
+            2r + 1 is its reverse format, so the reverse format is never stored.
+
+    :Return:
+        lst: List of findings denoted as [top10matches, searchedmatches], identical to analyze
+
+    :Time Complexity: O(N * M), where N is the number of matches and M is the number of characters in each team
+    :Aux Space Complexity: O(N), where N is the number of matches
+    """
+    # Start from the identity permutation of the (logical) rows
+    if virtual_reverse:
+        perm = array("q", range(2 * len(table)))
+    else:
+        perm = array("q", range(len(table)))
+
+    # Sort team2, then team1, then score in descending order
+    perm = radix_sort_table_team(table, perm, 1, virtual_reverse)  # O(M) * O(N)
+    perm = radix_sort_table_team(table, perm, 0, virtual_reverse)  # O(M) * O(N)
+    score_index = [[0, 0] for i in range(101)]
+    perm = counting_sort_table_score(table, perm, score_index, virtual_reverse)  # O(N)
+
+    # Filter duplicate matches, leaving a dense permutation and an updated score index
+    perm = filter_duplicates_table(table, perm, score_index, virtual_reverse)  # O(N) * O(M)
+
+    # Turn only the top 10 and the searched matches back into lists
+    top10matches = [table_match(table, perm[i], virtual_reverse) for i in range(min(10, len(perm)))]
+    searchedmatches = []
+    found_score = next_score(score_index, score)
+    if found_score is not None:
+        start, end = score_index[found_score]
+        searchedmatches = [table_match(table, perm[i], virtual_reverse) for i in range(start, end)]
+
+    return [top10matches, searchedmatches]
+
+
+def table_match(table: MatchTable, row: int, virtual_reverse: bool = False) -> list:
+    """
+    Function to turn a (logical) row of a MatchTable back into a [team1, team2, score] list.
+
+    :Input:
+        table: The MatchTable
+        row: The row number, or the logical row number if virtual_reverse is True
+        virtual_reverse: Whether row is a logical row number, as in analyze_table
+
+    :Return:
+        match: The match as [team1, team2, score]
+
+    :Time Complexity: O(M), where M is the number of characters in each team
+    :Aux Space Complexity: O(M), where M is the number of characters in each team
+    """
+    if not virtual_reverse:
+        return table.match(row)
+
+    # Odd logical rows are the reverse format of the stored row
+    if row & 1:
+        return [table.team(1, row >> 1), table.team(0, row >> 1), 100 - table.scores[row >> 1]]
+    return table.match(row >> 1)
+
+
+def radix_sort_table_team(table: MatchTable, perm, team_num: int, virtual_reverse: bool = False):
+    """
+    Function to sort the rows of a MatchTable by one of the teams in ascending lexicographical
+    order using radix sort algorithm.
+
+    :Input:
+        table: The MatchTable
+        perm: Array of row numbers in their current order
+        team_num: 0 to sort by team1, 1 to sort by team2
+        virtual_reverse: Whether perm holds logical row numbers, as in analyze_table
+
+    :Return:
+        perm: Array of row numbers sorted by the team
+
+    :Time Complexity: O(M * N), where N is the length of perm and M is the number of characters in each team
+    :Aux Space Complexity: O(N), where N is the length of perm
+    """
+    columns = table.team1 if team_num == 0 else table.team2
+    other_columns = table.team2 if team_num == 0 else table.team1
+
+    # Go through the character places starting from the last character
+    for j in range(table.width - 1, -1, -1):  # O(M) * O(N)
+        if virtual_reverse:
+            # The reverse format of a match reads this team from the other team's column
+            perm = counting_sort_column(perm, columns[j], table.roster, other_columns[j])
+        else:
+            perm = counting_sort_column(perm, columns[j], table.roster)
+
+    return perm
+
+
+def counting_sort_column(perm, column, num_keys: int, reverse_column=None):
+    """
+    Function to stably sort a permutation of rows by the value each row has in column,
+    using counting sort algorithm.
+
+    :Input:
+        perm: Array of row numbers in their current order
+        column: Column holding a value from 0 to num_keys - 1 for every row
+        num_keys: Number of different values in column
+        reverse_column:
+            Optional column for the reverse format. If it is given, perm holds logical row numbers,
+            and logical row 2r + 1 takes its value from reverse_column[r] instead of column[r].
+
+    :Return:
+        output: Array of row numbers sorted by their value in column
+
+    :Time Complexity: O(N + K), where N is the length of perm and K is num_keys
+    :Aux Space Complexity: O(N + K), where N is the length of perm and K is num_keys
+    """
+    # Look up the value of every row once
+    if reverse_column is None:
+        keys = [column[row] for row in perm]  # O(N)
+    else:
+        keys = [reverse_column[row >> 1] if row & 1 else column[row >> 1] for row in perm]  # O(N)
+
+    # Create count array and count every value
+    count = [0 for i in range(num_keys)]
+    for value in keys:  # O(N)
+        count[value] += 1
+
+    # Turn count into the starting position of every value
+    position = 0
+    for i in range(num_keys):  # O(K)
+        count[i], position = position, position + count[i]
+
+    # Place every row number at its position
+    output = array("q", bytes(8 * len(perm)))
+    for i in range(len(perm)):  # O(N)
+        value = keys[i]
+        output[count[value]] = perm[i]
+        count[value] += 1
+
+    return output
+
+
+def counting_sort_table_score(table: MatchTable, perm, score_index: list = None, virtual_reverse: bool = False):
+    """
+    Function to stably sort a permutation of rows by score in descending order, using one
+    counting sort pass over the 101 possible scores.
+
+    :Input:
+        table: The MatchTable
+        perm: Array of row numbers in their current order
+        score_index: Optional list of 101 [start, end] pairs, filled in as in radix_sort_score
+        virtual_reverse: Whether perm holds logical row numbers, as in analyze_table
+
+    :Return:
+        output: Array of row numbers sorted by score in descending order
+
+    :Time Complexity: O(N), where N is the length of perm
+    :Aux Space Complexity: O(N), where N is the length of perm
+    """
+    scores = table.scores
+
+    # Look up the score of every row once; the reverse format has the score 100 - score
+    if virtual_reverse:
+        keys = [100 - scores[row >> 1] if row & 1 else scores[row >> 1] for row in perm]  # O(N)
+    else:
+        keys = [scores[row] for row in perm]  # O(N)
+
+    # Count every score
+    count = [0 for i in range(101)]
+    for value in keys:  # O(N)
+        count[value] += 1
+
+    # Higher scores come first, so go through the scores from 100 down to 0
+    position = [0 for i in range(101)]
+    start = 0
+    for s in range(100, -1, -1):  # O(1)
+        position[s] = start
+        start += count[s]
+        if score_index is not None:
+            score_index[s][0] = position[s]
+            score_index[s][1] = start
+
+    # Place every row number at its position
+    output = array("q", bytes(8 * len(perm)))
+    for i in range(len(perm)):  # O(N)
+        value = keys[i]
+        output[position[value]] = perm[i]
+        position[value] += 1
+
+    return output
+
+
+def filter_duplicates_table(table: MatchTable, perm, score_index: list = None, virtual_reverse: bool = False):
+    """
+    Function to remove the duplicate matches from a sorted permutation of rows.
+    Unlike filter_duplicates, the duplicates are left out instead of being replaced by None.
+
+    :Input:
+        table: The MatchTable
+        perm: Array of row numbers sorted by score, team1 and team2
+        score_index: Optional score index of perm, which is updated to match the output
+        virtual_reverse: Whether perm holds logical row numbers, as in analyze_table
+
+    :Return:
+        output: Array of the row numbers of the unique matches, in the same order
+
+    :Time Complexity: O(N * M), where N is the length of perm and M is the number of characters in each team
+    :Aux Space Complexity: O(N), where N is the length of perm
+    """
+    output = array("q")
+
+    for i in range(len(perm)):  # O(N) * O(M)
+        # Keep the row if it differs from the previous kept row
+        if len(output) == 0 or not table_rows_equal(table, perm[i], output[-1], virtual_reverse):
+            output.append(perm[i])
+
+    # Rebuild the score index from the rows that were kept
+    if score_index is not None:
+        scores = table.scores
+        count = [0 for i in range(101)]
+        for row in output:  # O(N)
+            if virtual_reverse and row & 1:
+                count[100 - scores[row >> 1]] += 1
+            elif virtual_reverse:
+                count[scores[row >> 1]] += 1
+            else:
+                count[scores[row]] += 1
+        start = 0
+        for s in range(100, -1, -1):  # O(1)
+            score_index[s][0] = start
+            start += count[s]
+            score_index[s][1] = start
+
+    return output
+
+
+def table_rows_equal(table: MatchTable, a: int, b: int, virtual_reverse: bool = False) -> bool:
+    """
+    Function to check whether two (logical) rows of a MatchTable hold the same match.
+
+    :Input:
+        table: The MatchTable
+        a: The first row number
+        b: The second row number
+        virtual_reverse: Whether a and b are logical row numbers, as in analyze_table
+
+    :Return:
+        bool: True if both rows have the same team1, team2 and score
+
+    :Time Complexity: O(M), where M is the number of characters in each team
+    :Aux Space Complexity: O(1)
+    """
+    if not virtual_reverse:
+        if table.scores[a] != table.scores[b]:
+            return False
+        for columns in (table.team1, table.team2):
+            for column in columns:  # O(M)
+                if column[a] != column[b]:
+                    return False
+        return True
+
+    # Pick the columns each logical row reads its teams from
+    row_a, row_b = a >> 1, b >> 1
+    score_a = 100 - table.scores[row_a] if a & 1 else table.scores[row_a]
+    score_b = 100 - table.scores[row_b] if b & 1 else table.scores[row_b]
+    if score_a != score_b:
+        return False
+    first_a, second_a = (table.team2, table.team1) if a & 1 else (table.team1, table.team2)
+    first_b, second_b = (table.team2, table.team1) if b & 1 else (table.team1, table.team2)
+    for j in range(table.width):  # O(M)
+        if first_a[j][row_a] != first_b[j][row_b] or second_a[j][row_a] != second_b[j][row_b]:
+            return False
+    return True
+
+
+def analyze_shared(results: list, roster: int, score: int, workers: int = None) -> list:
+    """
+    Performs the analysis of analyze with the sorting spread over a pool of worker processes that
+    read the matches from shared memory. The columns of a MatchTable are copied into one shared
+    memory block once; every worker sorts a range of rows of that block in place (without copying
+    it) and only sends back the permutation of its rows, which are then merged.
+
+    :Input:
+        results:
+            Past tournament data represented as a list of lists [team1, team2, score].
+            The list is not modified.
+        roster:
+            Positive integer to denote the character set used in team1 and team2.
+        score:
+            The score we want to search for and return in searchedmatches.
+        workers:
+            Number of worker processes, defaults to the number of CPUs. Must be positive.
+
+    :Return:
+        lst: List of findings denoted as [top10matches, searchedmatches], identical to analyze
+
+    :Time Complexity: O(N * M / W + N * M * log(W)), where N is the length of results, M is the number of
+        characters in each team and W is the number of workers
+    :Aux Space Complexity: O(N * M), where N is the length of results and M is the number of characters in each team
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be positive")
+
+    table = MatchTable.from_results(results, roster)
+    n = len(table)
+    width = table.width
+
+    # Copy the columns into one shared block: team1 columns, then team2 columns, then the scores
+    block = shared_memory.SharedMemory(create=True, size=max(1, (2 * width + 1) * n))
+    try:
+        offset = 0
+        for column in table.team1 + table.team2 + [table.scores]:  # O(M) * O(N)
+            block.buf[offset:offset + n] = column
+            offset += n
+
+        # Give every worker one contiguous range of rows
+        range_size = max(1, -(-n // workers))
+        ranges = [(start, min(n, start + range_size)) for start in range(0, n, range_size)]
+
+        if len(ranges) <= 1 or workers == 1:
+            perms = [sort_shared_range(block.name, roster, width, n, start, end) for (start, end) in ranges]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(sort_shared_range, block.name, roster, width, n, start, end)
+                           for (start, end) in ranges]
+                perms = [future.result() for future in futures]
+    finally:
+        block.close()
+        block.unlink()
+
+    # Merge the permutations by score (descending), team1 and team2 on integer keys, dropping
+    # cross-range duplicates (equal keys) and recording where every score starts and ends
+    keys = table_sort_keys(table)  # O(M) * O(N)
+    merged = array("q")
+    score_index = [[0, 0] for i in range(101)]
+    last_key = None
+    for row in heapq.merge(*perms, key=keys.__getitem__):  # O(N * log(W))
+        if keys[row] == last_key:
+            continue
+        last_key = keys[row]
+        row_score = table.scores[row >> 1] if row & 1 == 0 else 100 - table.scores[row >> 1]
+        if score_index[row_score][1] == 0:
+            score_index[row_score][0] = len(merged)
+        merged.append(row)
+        score_index[row_score][1] = len(merged)
+
+    # Turn only the top 10 and the searched matches back into lists
+    top10matches = [table_match(table, merged[i], True) for i in range(min(10, len(merged)))]
+    searchedmatches = []
+    found_score = next_score(score_index, score)
+    if found_score is not None:
+        start, end = score_index[found_score]
+        searchedmatches = [table_match(table, merged[i], True) for i in range(start, end)]
+
+    return [top10matches, searchedmatches]
+
+
+def shared_table(buf, roster: int, width: int, n: int) -> MatchTable:
+    """
+    Function to view a shared memory block laid out by analyze_shared as a MatchTable.
+    The columns are memoryview slices of buf, so nothing is copied.
+
+    :Input:
+        buf: The buffer of the shared memory block
+        roster: Positive integer to denote the character set used in the teams
+        width: Number of characters in each team
+        n: Number of matches in the block
+
+    :Return:
+        table: MatchTable whose columns point into buf
+
+    :Time Complexity: O(M), where M is the number of characters in each team
+    :Aux Space Complexity: O(M), where M is the number of characters in each team
+    """
+    view = memoryview(buf)
+    team1 = [view[j * n:(j + 1) * n] for j in range(width)]
+    team2 = [view[(width + j) * n:(width + j + 1) * n] for j in range(width)]
+    scores = view[2 * width * n:(2 * width + 1) * n]
+    return MatchTable(roster, width, team1, team2, scores)
+
+
+def sort_shared_range(name: str, roster: int, width: int, n: int, start: int, end: int):
+    """
+    Function to sort and de-duplicate the rows from start to end (exclusive) of the shared memory
+    block called name, together with their reverse format. Runs in a worker process of analyze_shared.
+
+    :Input:
+        name: Name of the shared memory block
+        roster: Positive integer to denote the character set used in the teams
+        width: Number of characters in each team
+        n: Number of matches in the block
+        start: First row to sort
+        end: One more than the last row to sort
+
+    :Return:
+        perm: Array of the logical row numbers (see analyze_table) of the unique matches in the range,
+            sorted by score (descending), team1 and team2
+
+    :Time Complexity: O(R * M), where R is end - start and M is the number of characters in each team
+    :Aux Space Complexity: O(R), where R is end - start
+    """
+    from multiprocessing import shared_memory
+
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        table = shared_table(block.buf, roster, width, n)
+
+        # Sort the logical rows of the range, which include the reverse format of every match
+        perm = array("q", range(2 * start, 2 * end))
+        perm = radix_sort_table_team(table, perm, 1, True)
+        perm = radix_sort_table_team(table, perm, 0, True)
+        perm = counting_sort_table_score(table, perm, None, True)
+        perm = filter_duplicates_table(table, perm, None, True)
+
+        # Release the views into the block before closing it
+        table.team1 = table.team2 = table.scores = None
+        del table
+        return perm
+    finally:
+        block.close()
+
+
+def table_sort_keys(table: MatchTable) -> list:
+    """
+    Function to build one integer key per logical row (see analyze_table) of a MatchTable, so that
+    ordering the keys ascending orders the rows by score (descending), team1 and team2. The key is
+    100 - score, team1 and team2 read as one base-roster number, built column by column from the
+    byte columns without decoding any team. Equal keys mean equal matches.
+
+    :Input:
+        table: The MatchTable
+
+    :Return:
+        keys: List of 2N keys, where keys[row] is the key of logical row row
+
+    :Time Complexity: O(N * M), where N is the number of matches and M is the number of characters in each team
+    :Aux Space Complexity: O(N), where N is the number of matches
+    """
+    n = len(table)
+
+    # Read every team as a base-roster number, one character place at a time
+    packed1 = [0] * n
+    packed2 = [0] * n
+    for j in range(table.width):  # O(M) * O(N)
+        packed1 = [value * table.roster + code for value, code in zip(packed1, table.team1[j])]
+        packed2 = [value * table.roster + code for value, code in zip(packed2, table.team2[j])]
+
+    # Row 2r is (100 - score, team1, team2) and row 2r + 1 is its reverse format (score, team2, team1)
+    team_range = table.roster ** table.width
+    keys = [0] * (2 * n)
+    for r in range(n):  # O(N)
+        value = table.scores[r]
+        keys[2 * r] = ((100 - value) * team_range + packed1[r]) * team_range + packed2[r]
+        keys[2 * r + 1] = (value * team_range + packed2[r]) * team_range + packed1[r]
+    return keys
+
+
+def write_match_file(path: str, results: list, roster: int) -> None:
+    """
+    Function to write tournament results to a binary match file. The file starts with a
+    MATCH_FILE_HEADER (magic, version, roster, team width, number of matches), followed by one
+    fixed-width row per match: the codes of team1, the codes of team2 and one score byte.
+    Teams are written in their canonical (sorted) form, which is all the analysis needs.
+
+    :Input:
+        path: Path of the file to write
+        results: Past tournament data represented as a list of lists [team1, team2, score]
+        roster: Positive integer to denote the character set used in team1 and team2
+
+    :Time Complexity: O(N * M), where N is the length of results and M is the number of characters in each team
+    :Aux Space Complexity: O(N * M), where N is the length of results and M is the number of characters in each team
+    """
+    table = MatchTable.from_results(results, roster)
+    n = len(table)
+    row_size = 2 * table.width + 1
+
+    # Interleave the columns into rows; every column fills every row_size-th byte
+    rows = bytearray(n * row_size)
+    for j, column in enumerate(table.team1 + table.team2 + [table.scores]):  # O(M) * O(N)
+        rows[j::row_size] = column
+
+    with open(path, "wb") as file:
+        file.write(MATCH_FILE_HEADER.pack(MATCH_FILE_MAGIC, MATCH_FILE_VERSION, roster, table.width, n))
+        file.write(rows)
+
+
+def load_match_file(path: str) -> MatchTable:
+    """
+    Function to load a binary match file written by write_match_file as a MatchTable. The file is
+    memory-mapped and every column is a strided memoryview of the mapping, as in shared_table, so
+    nothing is copied and the operating system only reads the pages the analysis touches. The
+    mapping stays open for as long as the columns of the table are referenced.
+
+    :Input:
+        path: Path of the file to read
+
+    :Return:
+        table: MatchTable holding the canonical matches of the file
+
+    :Time Complexity: O(M), where M is the number of characters in each team
+    :Aux Space Complexity: O(M) besides the mapping, where M is the number of characters in each team
+    """
+    import mmap
+
+    with open(path, "rb") as file:
+        # An empty mmap is not allowed, so check the header size first
+        header = file.read(MATCH_FILE_HEADER.size)
+        if len(header) < MATCH_FILE_HEADER.size:
+            raise ValueError("Not a match file: " + str(path))
+        magic, version, roster, width, n = MATCH_FILE_HEADER.unpack(header)
+        if magic != MATCH_FILE_MAGIC or version != MATCH_FILE_VERSION:
+            raise ValueError("Not a match file or unsupported version: " + str(path))
+
+        row_size = 2 * width + 1
+        start = MATCH_FILE_HEADER.size
+        end = start + n * row_size
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(mapped) < end:
+        mapped.close()
+        raise ValueError("Match file is truncated: " + str(path))
+
+    # Column j of the table is byte j of every row; the views keep the mapping alive
+    view = memoryview(mapped)
+    columns = [view[start + j:end:row_size] for j in range(row_size)]  # O(M)
+
+    return MatchTable(roster, width, columns[:width], columns[width:2 * width], columns[2 * width])
+
+
+def analyze_file(path: str, score: int) -> list:
+    """
+    Performs the analysis of analyze on a binary match file written by write_match_file.
+
+    :Input:
+        path: Path of the match file
+        score: The score we want to search for and return in searchedmatches
+
+    :Return:
+        lst: List of findings denoted as [top10matches, searchedmatches], identical to analyze
+
+    :Time Complexity: O(N * M), where N is the number of matches and M is the number of characters in each team
+    :Aux Space Complexity: O(N * M), where N is the number of matches and M is the number of characters in each team
+    """
+    return analyze_table(load_match_file(path), score, virtual_reverse=True)
+
+
+def analyze_out_of_core(results, roster: int, score: int, memory_budget: int = 64 * 1024 * 1024,
+                        spill_dir: str = None) -> list:
+    """
+    Performs the analysis of analyze on results that do not fit in memory. The canonical matches and
+    their reverse format are partitioned by score into 101 spill files, buffering at most memory_budget
+    bytes before writing to disk. As the score order is fixed, only the highest score buckets (for
+    top10matches) and the searched bucket are then read back, sorted by team and de-duplicated.
+
+    :Input:
+        results:
+            Any iterable of matches [team1, team2, score]. The matches are not modified.
+        roster:
+            Positive integer to denote the character set used in team1 and team2.
+        score:
+            The score we want to search for and return in searchedmatches.
+        memory_budget:
+            Maximum number of bytes of matches buffered in memory before they are spilled to disk.
+            Every bucket that is read back has to fit in memory on its own.
+        spill_dir:
+            Directory in which the temporary spill directory is created, defaults to the system one.
+
+    :Return:
+        lst: List of findings denoted as [top10matches, searchedmatches], identical to analyze
+
+    :Time Complexity: O(N * M), where N is the number of matches and M is the number of characters in each team
+    :Aux Space Complexity: O(B + K * M) in memory, where B is memory_budget, K is the size of the largest bucket
+        that is read back and M is the number of characters in each team
+    """
+    import tempfile
+
+    with tempfile.TemporaryDirectory(dir=spill_dir) as directory:
+        paths = [os.path.join(directory, "score" + str(s)) for s in range(101)]
+        width, count = spill_by_score(results, roster, paths, memory_budget)
+
+        # Grab top 10 highest matches from the highest score buckets
+        top10matches = []
+        s = 100
+        while len(top10matches) < 10 and s >= 0:  # O(1)
+            for match in read_spilled_bucket(paths[s], roster, width, s, count[s]):
+                if len(top10matches) == 10:
+                    break
+                top10matches.append(match)
+            s -= 1
+
+        # Look for searchedmatches in the lowest non-empty bucket from score up; a bucket is
+        # empty if nothing was spilled to it, which also holds for empty teams that write no bytes
+        searchedmatches = []
+        for s in range(max(score, 0), 101):  # O(1)
+            if count[s] > 0:
+                searchedmatches = read_spilled_bucket(paths[s], roster, width, s, count[s])
+                break
+
+    return [top10matches, searchedmatches]
+
+
+def spill_by_score(results, roster: int, paths: list, memory_budget: int) -> tuple:
+    """
+    Function to partition the canonical matches of results and their reverse format into one file per
+    score. Each file holds team1 followed by team2 for every match with that score; the score itself is
+    given by the file. Buffers are written out whenever they hold more than memory_budget bytes.
+
+    :Input:
+        results: Any iterable of matches [team1, team2, score], which are not modified
+        roster: Positive integer to denote the character set used in team1 and team2
+        paths: List of 101 file paths, one per score; files are only created for scores with matches
+        memory_budget: Maximum number of bytes buffered before the buffers are written out
+
+    :Return:
+        tuple: (width, count), where width is the number of characters in each team, or 0 if there were
+            no matches, and count[s] is the number of matches (duplicates included) spilled with score s
+
+    :Time Complexity: O(N * M), where N is the number of matches and M is the number of characters in each team
+    :Aux Space Complexity: O(B), where B is memory_budget
+    """
+    buffers = [bytearray() for i in range(101)]
+    count = [0 for i in range(101)]
+    buffered = 0
+    width = None
+
+    for match in results:  # O(N) * O(M)
+        team1 = counting_sort_string(match[0], roster)
+        team2 = counting_sort_string(match[1], roster)
+        if width is None:
+            width = len(team1)
+        if len(team1) != width or len(team2) != width:
+            raise ValueError("All teams must have the same number of characters")
+
+        # Add the match and its reverse format to the buffers of their scores
+        buffers[match[2]] += (team1 + team2).encode("ascii")
+        buffers[100 - match[2]] += (team2 + team1).encode("ascii")
+        count[match[2]] += 1
+        count[100 - match[2]] += 1
+        buffered += 4 * width
+
+        if buffered > memory_budget:
+            flush_spill_buffers(buffers, paths)
+            buffered = 0
+
+    flush_spill_buffers(buffers, paths)
+    return (0 if width is None else width), count
+
+
+def flush_spill_buffers(buffers: list, paths: list) -> None:
+    """
+    Function to append every non-empty buffer to the spill file of its score and empty it.
+
+    :Input:
+        buffers: List of 101 bytearrays, one per score
+        paths: List of 101 file paths, one per score
+
+    :Time Complexity: O(B), where B is the total size of the buffers
+    :Aux Space Complexity: O(1)
+    """
+    for s in range(101):  # O(1)
+        if len(buffers[s]) > 0:
+            with open(paths[s], "ab") as file:
+                file.write(buffers[s])
+            buffers[s].clear()
+
+
+def read_spilled_bucket(path: str, roster: int, width: int, score: int, count: int) -> list:
+    """
+    Function to read back the spill file of one score, then sort its matches by team1 and team2 and
+    drop the duplicates.
+
+    :Input:
+        path: Path of the spill file written by spill_by_score
+        roster: Positive integer to denote the character set used in the teams
+        width: Number of characters in each team
+        score: The score of every match in the file
+        count: Number of matches spilled to the file, as counted by spill_by_score
+
+    :Return:
+        lst: List of the unique matches [team1, team2, score] of the bucket in sorted order,
+            or an empty list if count is 0
+
+    :Time Complexity: O(K * M), where K is the number of matches in the file and M is the number of
+        characters in each team
+    :Aux Space Complexity: O(K * M), where K is the number of matches in the file and M is the number of
+        characters in each team
+    """
+    if count == 0:
+        return []
+
+    # Teams of no characters write nothing, so the file only exists if width is positive
+    data = ""
+    if width > 0:
+        with open(path, "rb") as file:
+            data = file.read().decode("ascii")
+
+    # Cut the file into count matches
+    lst = []
+    for i in range(count):  # O(K)
+        start = 2 * width * i
+        lst.append([data[start:start + width], data[start + width:start + 2 * width], score])
+
+    # Sort team2 and then team1, leaving out duplicate matches in the score pass
+    lst = radix_sort_team(lst, roster, 1)
+    lst = radix_sort_team(lst, roster, 0)
+    return radix_sort_score(lst, compact=True)
+
+
+def save_snapshot(path: str, prepared: PreparedResults, fingerprint: str) -> None:
+    """
+    Function to save sorted, de-duplicated results to a snapshot file, so that a restarted process
+    can answer searches without sorting again. The file holds a SNAPSHOT_HEADER, the score index as
+    101 (start, end) pairs, and then one row per unique match in sorted order: team1 and team2 as
+    ASCII letters followed by one score byte.
+
+    :Input:
+        path: Path of the file to write
+        prepared: The PreparedResults to save
+        fingerprint: dataset_fingerprint of the results that prepared was built from
+
+    :Time Complexity: O(N * M), where N is the number of matches and M is the number of characters in each team
+    :Aux Space Complexity: O(N * M), where N is the number of matches and M is the number of characters in each team
+    """
+    matches = prepared.matches
+    score_index = prepared.score_index
+    width = 0 if len(matches) == 0 else len(matches[0][0])
+
+    rows = bytearray()
+    for match in matches:  # O(N) * O(M)
+        rows += (match[0] + match[1]).encode("ascii")
+        rows.append(match[2])
+
+    with open(path, "wb") as file:
+        file.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, width, len(matches),
+                                        bytes.fromhex(fingerprint)))
+        file.write(SNAPSHOT_INDEX.pack(*[position for pair in score_index for position in pair]))
+        file.write(rows)
+
+
+def load_snapshot(path: str, fingerprint: str = None) -> "SnapshotResults":
+    """
+    Function to open a snapshot file written by save_snapshot. The file is memory-mapped and nothing
+    is sorted; matches are only decoded when they are returned by a search.
+
+    :Input:
+        path: Path of the snapshot file
+        fingerprint: Optional dataset_fingerprint of the current results. If it is given and differs
+            from the one stored in the snapshot, the snapshot is stale and ValueError is raised.
+
+    :Return:
+        snapshot: SnapshotResults answering top10 and searches like PreparedResults
+
+    :Time Complexity: O(1)
+    :Aux Space Complexity: O(1) besides the mapping
+    """
+    import mmap
+
+    with open(path, "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        if len(mapped) < SNAPSHOT_HEADER.size + SNAPSHOT_INDEX.size:
+            raise ValueError("Not a snapshot file: " + str(path))
+        magic, version, width, n, stored = SNAPSHOT_HEADER.unpack_from(mapped, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError("Not a snapshot file or unsupported version: " + str(path))
+        if fingerprint is not None and bytes.fromhex(fingerprint) != stored:
+            raise ValueError("Snapshot was made from different results: " + str(path))
+        positions = SNAPSHOT_INDEX.unpack_from(mapped, SNAPSHOT_HEADER.size)
+        start = SNAPSHOT_HEADER.size + SNAPSHOT_INDEX.size
+        if len(mapped) < start + n * (2 * width + 1):
+            raise ValueError("Snapshot file is truncated: " + str(path))
+    except ValueError:
+        mapped.close()
+        raise
+
+    score_index = [[positions[2 * s], positions[2 * s + 1]] for s in range(101)]
+    return SnapshotResults(mapped, start, width, n, score_index, stored.hex())
+
+
+class SnapshotResults:
+    """
+    Sorted, de-duplicated results read from a memory-mapped snapshot file (see save_snapshot),
+    answering the same queries as PreparedResults.
+
+    :Attributes:
+        mapped: The memory-mapped snapshot file
+        start: Offset of the first row in mapped
+        width: Number of characters in each team
+        n: Number of unique matches
+        score_index: List of 101 [start, end] row positions, one per score
+        fingerprint: dataset_fingerprint of the results the snapshot was made from
+    """
+
+    def __init__(self, mapped, start: int, width: int, n: int, score_index: list, fingerprint: str) -> None:
+        """
+        Creates the results from an opened snapshot; use load_snapshot instead of calling this directly.
+
+        :Time Complexity: O(1)
+        :Aux Space Complexity: O(1)
+        """
+        self.mapped = mapped
+        self.start = start
+        self.width = width
+        self.n = n
+        self.score_index = score_index
+        self.fingerprint = fingerprint
+
+    def match(self, i: int) -> list:
+        """
+        Returns row i of the snapshot as a [team1, team2, score] list.
+
+        :Time Complexity: O(M), where M is the number of characters in each team
+        :Aux Space Complexity: O(M), where M is the number of characters in each team
+        """
+        offset = self.start + i * (2 * self.width + 1)
+        teams = self.mapped[offset:offset + 2 * self.width].decode("ascii")
+        return [teams[:self.width], teams[self.width:], self.mapped[offset + 2 * self.width]]
+
+    def top(self, k: int) -> list:
+        """
+        Returns the k matches with the highest score.
+
+        :Time Complexity: O(k * M), where M is the number of characters in each team
+        :Aux Space Complexity: O(k * M), where M is the number of characters in each team
+        """
+        return [self.match(i) for i in range(min(k, self.n))]
+
+    def top10(self) -> list:
+        """
+        Returns the 10 matches with the highest score, as top10matches in analyze.
+
+        :Time Complexity: O(M), where M is the number of characters in each team
+        :Aux Space Complexity: O(M), where M is the number of characters in each team
+        """
+        return self.top(10)
+
+    def search(self, score: int) -> list:
+        """
+        Returns the matches with the given score, or with the next highest score if there are
+        none, as searchedmatches in analyze.
+
+        :Time Complexity: O(K * M), where K is the number of matches returned and M is the number of
+            characters in each team
+        :Aux Space Complexity: O(K * M), where K is the number of matches returned and M is the number of
+            characters in each team
+        """
+        found_score = next_score(self.score_index, score)
+        if found_score is None:
+            return []
+        start, end = self.score_index[found_score]
+        return [self.match(i) for i in range(start, end)]
+
+    def close(self) -> None:
+        """
+        Closes the memory-mapped file.
+
+        :Time Complexity: O(1)
+        :Aux Space Complexity: O(1)
+        """
+        self.mapped.close()
+
+
+def analyze_msd(results: list, roster: int, score: int) -> list:
+    """
+    Performs the analysis of analyze on teams of different lengths. radix_sort_team needs every team
+    to have the same length, so the teams are sorted with msd_radix_sort_teams instead, whose cost
+    depends on how many characters are needed to tell the teams apart rather than on N times the
+    longest team.
+
+    :Input:
+        results:
+            Past tournament data represented as a list of lists [team1, team2, score].
+            The list is not modified.
+        roster:
+            Positive integer to denote the character set used in team1 and team2.
+        score:
+            The score we want to search for and return in searchedmatches.
+
+    :Return:
+        lst: List of findings denoted as [top10matches, searchedmatches], as analyze would return
+            if it accepted teams of different lengths
+
+    :Time Complexity: O(N * roster + D), where N is the length of results and D is the total number of
+        characters needed to tell the matches apart
+    :Aux Space Complexity: O(N + L), where N is the length of results and L is the length of the longest team
+    """
+    # Build the canonical matches together with their reverse format
+    lst = canonical_matches(results, roster)  # O(N) * O(M)
+
+    # Sort by team1 and then team2, then score in descending order without duplicates
+    lst = msd_radix_sort_teams(lst, roster)
+    score_index = [[0, 0] for i in range(101)]
+    lst = radix_sort_score(lst, score_index, compact=True)  # O(N)
+
+    return [lst[:10], search_score_index(lst, score_index, score)]
+
+
+def msd_radix_sort_teams(lst: list, roster: int, insertion_threshold: int = 16) -> list:
+    """
+    Function to sort matches by team1 and then team2 in ascending lexicographical order, where the teams
+    can have different lengths, using most significant digit (MSD) radix sort. A match is read as the
+    characters of team1, a separator, and the characters of team2. The separator and the end of the key
+    are smaller than every letter, so a team comes before every longer team it is a prefix of. Only
+    buckets with more than one match are split further, and buckets smaller than insertion_threshold are
+    finished with insertion sort.
+
+    :Input:
+        lst: The results list to be sorted, which is not modified
+        roster: Positive integer to denote the character set used in the teams
+        insertion_threshold: Buckets with fewer matches than this are sorted with insertion sort
+
+    :Return:
+        lst: New list of the matches sorted by team1 and then team2
+
+    :Time Complexity: O(N * roster + D), where N is the length of lst and D is the total number of characters
+        needed to tell the matches apart
+    :Aux Space Complexity: O(N + L), where N is the length of lst and L is the length of the longest key
+    """
+    lst = list(lst)
+    aux = [None for i in range(len(lst))]  # O(N)
+
+    # Stack of (start, end, depth) buckets that still have to be sorted from character depth onwards
+    stack = [(0, len(lst), 0)]
+    while len(stack) > 0:
+        start, end, depth = stack.pop()
+
+        # Small buckets are finished with insertion sort
+        if end - start < insertion_threshold:
+            insertion_sort_teams(lst, start, end)
+            continue
+
+        # Count the character at depth of every match; 0 is the end of the key, 1 the separator
+        keys = [msd_key(lst[i], depth) for i in range(start, end)]
+        count = [0 for i in range(roster + 2)]
+        for key in keys:
+            count[key] += 1
+
+        # Turn count into the starting position of every character
+        position = [0 for i in range(roster + 2)]
+        for i in range(1, roster + 2):
+            position[i] = position[i - 1] + count[i - 1]
+
+        # Distribute the matches into aux and copy them back in their new order
+        for i in range(start, end):
+            key = keys[i - start]
+            aux[start + position[key]] = lst[i]
+            position[key] += 1
+        lst[start:end] = aux[start:end]
+
+        # Split every bucket with more than one match on the next character; matches in
+        # bucket 0 have the same key already
+        bucket_start = start
+        for key in range(roster + 2):
+            if key > 0 and count[key] > 1:
+                stack.append((bucket_start, bucket_start + count[key], depth + 1))
+            bucket_start += count[key]
+
+    return lst
+
+
+def msd_key(match: list, depth: int) -> int:
+    """
+    Function to find the character at depth of the key of a match read by msd_radix_sort_teams.
+
+    :Input:
+        match: The match [team1, team2, score]
+        depth: Position in the key
+
+    :Return:
+        int: 0 past the end of the key, 1 for the separator between the teams, 2 for A, 3 for B, and so on
+
+    :Time Complexity: O(1)
+    :Aux Space Complexity: O(1)
+    """
+    team1 = match[0]
+    if depth < len(team1):
+        return ord(team1[depth]) - 63
+    if depth == len(team1):
+        return 1
+    depth -= len(team1) + 1
+    if depth < len(match[1]):
+        return ord(match[1][depth]) - 63
+    return 0
+
+
+def insertion_sort_teams(lst: list, start: int, end: int) -> None:
+    """
+    Function to sort lst[start:end] by team1 and then team2 using insertion sort.
+
+    :Input:
+        lst: The results list
+        start: First position to sort
+        end: One more than the last position to sort
+
+    :Time Complexity: O(K^2 * L), where K is end - start and L is the length of the longest team
+    :Aux Space Complexity: O(1)
+    """
+    for i in range(start + 1, end):
+        match = lst[i]
+        j = i - 1
+        while j >= start and (lst[j][0], lst[j][1]) > (match[0], match[1]):
+            lst[j + 1] = lst[j]
+            j -= 1
+        lst[j + 1] = match
+
+
+def load_results(path: str) -> tuple:
+    """
+    Function to load tournament results from a file. Binary match files (see write_match_file) are
+    recognised by their header, files ending in .csv are read as team1,team2,score rows and any other
+    file is read as a JSON list of [team1, team2, score].
+
+    :Input:
+        path: Path of the file, or - for a JSON list on standard input
+
+    :Return:
+        tuple: (results, roster), where roster is the roster stored in a binary match file or None
+
+    :Time Complexity: O(N * M), where N is the number of matches and M is the number of characters in each team
+    :Aux Space Complexity: O(N * M), where N is the number of matches and M is the number of characters in each team
+    """
+    if path == "-":
+        return json.load(sys.stdin), None
+
+    with open(path, "rb") as file:
+        magic = file.read(len(MATCH_FILE_MAGIC))
+
+    if magic == MATCH_FILE_MAGIC:
+        table = load_match_file(path)
+        return [table.match(i) for i in range(len(table))], table.roster
+
+    if path.lower().endswith(".csv"):
+        import csv
+
+        with open(path, newline="") as file:
+            return [[row[0], row[1], int(row[2])] for row in csv.reader(file) if len(row) > 0], None
+
+    with open(path) as file:
+        return json.load(file), None
+
+
+def analyze_path(path: str, roster: int, scores: list, k: int = 10) -> dict:
+    """
+    Function to analyze one results file, sorting it once for all of the searched scores.
+
+    :Input:
+        path: Path of the file, as accepted by load_results
+        roster: Positive integer to denote the character set used in the teams, unless the file stores one
+        scores: List of the scores we want to search for
+        k: Number of highest score matches to return
+
+    :Return:
+        dict: {"file": path, "top": top k matches, "searched": [{"score": score, "matches": matches}, ...]},
+            or {"file": path, "error": message} if the file could not be analyzed
+
+    :Time Complexity: O(N * M + S * K), where N is the number of matches, M is the number of characters in
+        each team, S is the length of scores and K is the size of the largest searchedmatches
+    :Aux Space Complexity: O(N * M), where N is the number of matches and M is the number of characters in each team
+    """
+    try:
+        results, file_roster = load_results(path)
+        prepared = PreparedResults(results, roster if file_roster is None else file_roster)
+    except (OSError, ValueError, IndexError, TypeError) as error:
+        return {"file": path, "error": str(error)}
+
+    return {"file": path,
+            "top": prepared.top(k),
+            "searched": [{"score": score, "matches": prepared.search(score)} for score in scores]}
+
+
+def expand_inputs(patterns: list) -> list:
+    """
+    Function to expand glob patterns into file paths. Patterns without any match are kept
+    as they are, so that the missing file is reported.
+
+    :Input:
+        patterns: List of file paths and glob patterns
+
+    :Return:
+        paths: List of file paths, in the order of the patterns
+
+    :Time Complexity: O(P + F), where P is the number of patterns and F is the number of files found
+    :Aux Space Complexity: O(F), where F is the number of files found
+    """
+    import glob
+
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern))
+        paths.extend(matches if len(matches) > 0 else [pattern])
+    return paths
+
+
+def main(argv: list = None) -> int:
+    """
+    Command line entry point. Analyzes every input file (or a JSON list on standard input), sorting each
+    file once for all of the --score values, and writes one JSON line per file as soon as it is done.
+    Files are analyzed concurrently in a pool of worker processes.
+
+    :Input:
+        argv: Command line arguments, defaults to sys.argv[1:]
+
+    :Return:
+        int: Exit status, 1 if any file could not be analyzed and 0 otherwise
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Analyze tournament result files and write JSON Lines.")
+    parser.add_argument("inputs", nargs="*", default=["-"],
+                        help="result files or glob patterns (JSON, CSV or binary match files), "
+                             "- for standard input")
+    parser.add_argument("--roster", type=int, default=26, help="number of letters the teams are made of")
+    parser.add_argument("--score", type=int, action="append", dest="scores",
+                        help="score to search for, can be given more than once")
+    parser.add_argument("--top", type=int, default=10, help="number of highest score matches to return")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    args = parser.parse_args(argv)
+
+    scores = [0] if args.scores is None else args.scores
+    paths = expand_inputs(args.inputs)
+    failed = False
+
+    def write(finding: dict) -> None:
+        sys.stdout.write(json.dumps(finding) + "\n")
+        sys.stdout.flush()
+
+    # A single file, or standard input, is analyzed in this process
+    if len(paths) == 1 or args.workers == 1 or "-" in paths:
+        for path in paths:
+            finding = analyze_path(path, args.roster, scores, args.top)
+            failed = failed or "error" in finding
+            write(finding)
+        return 1 if failed else 0
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = [executor.submit(analyze_path, path, args.roster, scores, args.top) for path in paths]
+        for future in as_completed(futures):
+            finding = future.result()
+            failed = failed or "error" in finding
+            write(finding)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -404,4 +404,5 @@ one_match = [["CBA", "DBD", 85]]
 
 example2 = [["CBA", "DBD", 85], ["CBA", "DAD", 85], ["CBA", "DBD", 85], ["CBA", "DBD", 85]]
 
-print(analyze(example, 5, 23))
+if __name__ == "__main__":
+    print(analyze(example, 5, 23))
@@ -0,0 +1,244 @@
+"""
+Benchmarks for assignment1.analyze and every stage of its sort.
+
+Generates synthetic tournament results for every combination of N, team length M and roster,
+times each stage and every analyze engine, and writes the timings as JSON so that runs can be
+compared across engines and commits.
+
+Usage: python benchmark.py --sizes 1000 10000 --widths 3 8 --rosters 5 26 --output bench.json
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import assignment1
+
+
+def generate_results(n: int, width: int, roster: int, seed: int = 0, score_distribution: str = "uniform",
+                     duplicate_rate: float = 0.0) -> list:
+    """
+    Function to generate random tournament results.
+
+    :Input:
+        n: Number of matches
+        width: Number of characters in each team
+        roster: Number of letters the teams are made of
+        seed: Seed of the random number generator
+        score_distribution:
+            "uniform" for scores spread evenly over 0 to 100, "skewed" for scores piled up
+            around a few values, which makes some score buckets very large
+        duplicate_rate: Fraction of matches that repeat an earlier match (possibly in reverse format)
+
+    :Return:
+        results: List of matches [team1, team2, score]
+
+    :Time Complexity: O(N * M), where N is n and M is width
+    :Aux Space Complexity: O(N * M), where N is n and M is width
+    """
+    rng = random.Random(seed)
+    letters = [chr(65 + i) for i in range(roster)]
+    hot_scores = [rng.randrange(101) for _ in range(3)]
+
+    results = []
+    for _ in range(n):
+        # Repeat an earlier match, either as it is or in its reverse format
+        if len(results) > 0 and rng.random() < duplicate_rate:
+            match = results[rng.randrange(len(results))]
+            if rng.random() < 0.5:
+                results.append([match[1], match[0], 100 - match[2]])
+            else:
+                results.append(list(match))
+            continue
+
+        if score_distribution == "skewed" and rng.random() < 0.9:
+            score = rng.choice(hot_scores)
+        else:
+            score = rng.randrange(101)
+        team1 = "".join(rng.choice(letters) for _ in range(width))
+        team2 = "".join(rng.choice(letters) for _ in range(width))
+        results.append([team1, team2, score])
+
+    return results
+
+
+def time_call(function, repeat: int) -> float:
+    """
+    Function to time a call, returning the best of repeat runs in seconds.
+    function is given a fresh setup for every run, so in-place stages can be timed.
+
+    :Input:
+        function: Function taking no arguments that returns a function to time
+        repeat: Number of runs
+
+    :Return:
+        float: The fastest run in seconds
+
+    :Time Complexity: O(R * T), where R is repeat and T is the time of one run
+    :Aux Space Complexity: O(1)
+    """
+    best = None
+    for _ in range(repeat):
+        call = function()
+        start = time.perf_counter()
+        call()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def benchmark_stages(results: list, roster: int, score: int, repeat: int) -> dict:
+    """
+    Function to time every stage of analyze on its own, giving each stage the input it gets in analyze.
+    radix_sort_score is timed as analyze runs it, removing duplicates and filling the score index.
+
+    :Input:
+        results: Tournament results, which are not modified
+        roster: Number of letters the teams are made of
+        score: The score to search for
+        repeat: Number of runs of every stage
+
+    :Return:
+        dict: Mapping of stage name to its fastest run in seconds
+
+    :Time Complexity: O(R * N * M), where R is repeat, N is the length of results and M is the team length
+    :Aux Space Complexity: O(N * M), where N is the length of results and M is the team length
+    """
+    def copy(lst):
+        return [list(match) for match in lst]
+
+    # Build the input of every stage once
+    doubled = copy(results)
+    assignment1.add_reverse(doubled)
+    canonical = [[assignment1.counting_sort_string(match[0], roster),
+                  assignment1.counting_sort_string(match[1], roster), match[2]] for match in doubled]
+    by_team2 = assignment1.radix_sort_team(canonical, roster, 1)
+    by_team = assignment1.radix_sort_team(by_team2, roster, 0)
+    score_index = [[0, 0] for i in range(101)]
+    by_score = assignment1.radix_sort_score(by_team, score_index, compact=True)
+
+    def canonicalise(lst):
+        for match in lst:
+            assignment1.counting_sort_string(match[0], roster)
+            assignment1.counting_sort_string(match[1], roster)
+
+    stages = {
+        "add_reverse": lambda: (lambda lst=copy(results): assignment1.add_reverse(lst)),
+        "counting_sort_string": lambda: (lambda: canonicalise(doubled)),
+        "radix_sort_team": lambda: (lambda: assignment1.radix_sort_team(
+            assignment1.radix_sort_team(canonical, roster, 1), roster, 0)),
+        "radix_sort_score": lambda: (lambda: assignment1.radix_sort_score(
+            by_team, [[0, 0] for i in range(101)], compact=True)),
+        "search_score_index": lambda: (lambda: assignment1.search_score_index(by_score, score_index, score)),
+    }
+    return {name: time_call(setup, repeat) for name, setup in stages.items()}
+
+
+def benchmark_engines(results: list, roster: int, score: int, repeat: int, engines: list) -> dict:
+    """
+    Function to time analyze end to end with every engine.
+
+    :Input:
+        results: Tournament results, which are not modified
+        roster: Number of letters the teams are made of
+        score: The score to search for
+        repeat: Number of runs of every engine
+        engines: Names of the engines to time
+
+    :Return:
+        dict: Mapping of engine name to its fastest run in seconds, or None if the engine is not available
+
+    :Time Complexity: O(R * E * N * M), where R is repeat, E is the number of engines, N is the length
+        of results and M is the team length
+    :Aux Space Complexity: O(N * M), where N is the length of results and M is the team length
+    """
+    timings = {}
+    for engine in engines:
+        try:
+            timings[engine] = time_call(
+                lambda: (lambda lst=[list(match) for match in results]:
+                         assignment1.analyze(lst, roster, score, engine)),
+                repeat)
+        except ImportError:
+            timings[engine] = None
+    return timings
+
+
+def git_commit() -> str:
+    """
+    Function to find the commit being benchmarked.
+
+    :Return:
+        str: The commit hash, or None if it cannot be found
+
+    :Time Complexity: O(1)
+    :Aux Space Complexity: O(1)
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: list = None) -> None:
+    """
+    Runs the benchmarks described by the command line arguments and writes the JSON report.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark assignment1.analyze and its sort stages.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="numbers of matches N")
+    parser.add_argument("--widths", type=int, nargs="+", default=[3, 10], help="team lengths M")
+    parser.add_argument("--rosters", type=int, nargs="+", default=[5, 26], help="roster sizes")
+    parser.add_argument("--distributions", nargs="+", default=["uniform", "skewed"],
+                        choices=["uniform", "skewed"], help="score distributions")
+    parser.add_argument("--duplicate-rates", type=float, nargs="+", default=[0.0, 0.5],
+                        help="fractions of repeated matches")
+    parser.add_argument("--engines", nargs="+",
+                        default=["python", "packed", "table", "hashed", "msd", "numpy", "auto"],
+                        help="analyze engines to time end to end")
+    parser.add_argument("--score", type=int, default=50, help="score to search for")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement; the fastest is kept")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generated results")
+    parser.add_argument("--output", help="file to write the JSON report to, defaults to stdout")
+    args = parser.parse_args(argv)
+
+    runs = []
+    for n in args.sizes:
+        for width in args.widths:
+            for roster in args.rosters:
+                for distribution in args.distributions:
+                    for duplicate_rate in args.duplicate_rates:
+                        results = generate_results(n, width, roster, args.seed, distribution, duplicate_rate)
+                        runs.append({
+                            "n": n,
+                            "width": width,
+                            "roster": roster,
+                            "score_distribution": distribution,
+                            "duplicate_rate": duplicate_rate,
+                            "stages": benchmark_stages(results, roster, args.score, args.repeat),
+                            "engines": benchmark_engines(results, roster, args.score, args.repeat, args.engines),
+                        })
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "repeat": args.repeat,
+        "runs": runs,
+    }
+
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,496 @@
+"""
+Tests comparing every engine and entry point of assignment1 with a brute-force reference of analyze.
+
+Run with: python -m pytest -q
+"""
+import asyncio
+import copy
+import json
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+
+import assignment1
+
+
+def reference_order(results: list) -> list:
+    """
+    Brute-force sort: canonical teams, reverse format, duplicates removed with a set, then one
+    comparison sort by score (descending), team1 and team2.
+    """
+    unique = set()
+    for team1, team2, value in results:
+        team1 = "".join(sorted(team1))
+        team2 = "".join(sorted(team2))
+        unique.add((team1, team2, value))
+        unique.add((team2, team1, 100 - value))
+    return sorted(unique, key=lambda match: (-match[2], match[0], match[1]))
+
+
+def reference(results: list, roster: int, score: int) -> list:
+    """
+    Brute-force analyze on top of reference_order.
+    """
+    ordered = reference_order(results)
+
+    searchedmatches = []
+    for value in range(max(score, 0), 101):
+        searchedmatches = [list(match) for match in ordered if match[2] == value]
+        if len(searchedmatches) > 0:
+            break
+    return [[list(match) for match in ordered[:10]], searchedmatches]
+
+
+def generate(n: int, width: int, roster: int, rng: random.Random, duplicate_rate: float = 0.3) -> list:
+    """
+    Random results where about duplicate_rate of the matches repeat an earlier one, possibly in reverse format.
+    """
+    results = []
+    for _ in range(n):
+        if len(results) > 0 and rng.random() < duplicate_rate:
+            team1, team2, value = rng.choice(results)
+            results.append([team2, team1, 100 - value] if rng.random() < 0.5 else [team1, team2, value])
+            continue
+        team1 = "".join(chr(65 + rng.randrange(roster)) for _ in range(width))
+        team2 = "".join(chr(65 + rng.randrange(roster)) for _ in range(width))
+        results.append([team1, team2, rng.randrange(101)])
+    return results
+
+
+# Searched scores below 0, on both ends of the range, above 100 and random ones
+EDGE_SCORES = [-7, 0, 50, 100, 101, 150]
+
+
+def cases(count: int = 40, seed: int = 0) -> list:
+    """
+    List of (results, roster, score) cases, starting with empty results and results at scores 0 and 100.
+    """
+    rng = random.Random(seed)
+    found = [([], 5, score) for score in EDGE_SCORES]
+    found += [([["AB", "BA", 0], ["CC", "AB", 100]], 3, score) for score in EDGE_SCORES]
+    for _ in range(count):
+        n = rng.choice([1, 2, 5, 12, 40, 300])
+        width = rng.choice([1, 2, 3, 5])
+        roster = rng.randint(1, 26)
+        score = rng.choice(EDGE_SCORES + [rng.randrange(101)])
+        found.append((generate(n, width, roster, rng), roster, score))
+    return found
+
+
+CASES = cases()
+SMALL_CASES = cases(count=8, seed=1)
+
+
+def test_reference_matches_baseline():
+    """The reference agrees with the original analyze, using a copy as analyze modifies results."""
+    for results, roster, score in CASES:
+        assert assignment1.analyze(copy.deepcopy(results), roster, score) == reference(results, roster, score)
+
+
+def test_numpy_engine():
+    pytest.importorskip("numpy")
+    for results, roster, score in CASES:
+        got = assignment1.analyze(copy.deepcopy(results), roster, score, engine="numpy")
+        assert got == reference(results, roster, score)
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        assignment1.analyze([["A", "B", 1]], 2, 1, engine="missing")
+
+
+@pytest.mark.parametrize("engine", ["python", "packed", "table", "shared", "hashed", "msd"])
+def test_engines(engine):
+    for results, roster, score in CASES:
+        got = assignment1.analyze(copy.deepcopy(results), roster, score, engine=engine)
+        assert got == reference(results, roster, score)
+
+
+def test_incremental():
+    for results, roster, score in CASES:
+        analyzer = assignment1.IncrementalAnalyzer(roster)
+
+        # Query between the batches so that new matches are merged into buckets that are already sorted
+        for start in range(0, len(results), 7):
+            analyzer.add_matches(copy.deepcopy(results[start:start + 7]))
+            assert [analyzer.top10(), analyzer.search(score)] == reference(results[:start + 7], roster, score)
+        assert [analyzer.top10(), analyzer.search(score)] == reference(results, roster, score)
+
+    # A repeated match is not added again
+    analyzer = assignment1.IncrementalAnalyzer(3)
+    analyzer.add_matches([["AB", "CA", 40], ["BA", "AC", 40], ["AC", "AB", 60]])
+    assert analyzer.search(40) == [["AB", "AC", 40]]
+    assert analyzer.pending[40] == [] and len(analyzer.pending[60]) == 1
+
+
+def test_top_k_matches():
+    for results, roster, score in CASES:
+        ordered = [list(match) for match in reference_order(results)]
+        for k in [0, 1, 10, len(ordered), len(ordered) + 5]:
+            assert assignment1.top_k_matches(results, roster, k) == ordered[:k]
+
+    # The 20 copies of the 90 match fill the first cutoff, so the lower scores have to be sorted too
+    results = [["AB", "BA", 90]] * 20 + [["CC", "AA", value] for value in range(80, 90)]
+    ordered = [list(match) for match in reference_order(results)]
+    for k in [1, 2, 5, 11, 40]:
+        assert assignment1.top_k_matches(results, 3, k) == ordered[:k]
+
+
+def test_score_index():
+    for results, roster, score in CASES:
+        ordered = [list(match) for match in reference_order(results)]
+        score_index = [[0, 0] for i in range(101)]
+        assignment1.fill_score_index(ordered, score_index)
+        for value in EDGE_SCORES + [score]:
+            assert assignment1.search_score_index(ordered, score_index, value) == \
+                reference(results, roster, value)[1]
+        if len(ordered) == 0:
+            assert assignment1.next_score(score_index, -1) is None
+
+
+def test_prepared_results_and_analyze_many():
+    for results, roster, score in CASES:
+        original = copy.deepcopy(results)
+        expected = [reference(results, roster, value) for value in EDGE_SCORES + [score]]
+        assert assignment1.analyze_many(results, roster, EDGE_SCORES + [score]) == expected
+        assert results == original
+
+        prepared = assignment1.PreparedResults(results, roster)
+        assert [prepared.top10(), prepared.search(score)] == reference(results, roster, score)
+        assert prepared.top(3) == reference(results, roster, score)[0][:3]
+
+
+def test_table():
+    for results, roster, score in CASES:
+        table = assignment1.MatchTable.from_results(results, roster)
+        assert [table.match(i) for i in range(len(table))] == \
+            [["".join(sorted(team1)), "".join(sorted(team2)), value] for team1, team2, value in results]
+        assignment1.add_reverse_table(table)
+        assert assignment1.analyze_table(table, score) == reference(results, roster, score)
+
+    with pytest.raises(ValueError):
+        assignment1.MatchTable.from_results([["AB", "C", 10]], 3)
+
+
+def test_virtual_reverse():
+    for results, roster, score in CASES:
+        table = assignment1.MatchTable.from_results(results, roster)
+        assert assignment1.analyze_table(table, score, virtual_reverse=True) == reference(results, roster, score)
+        assert len(table) == len(results)
+
+
+def test_canonical_team_cache():
+    for results, roster, score in CASES:
+        cache = assignment1.CanonicalTeamCache(max_size=4)
+        assert assignment1.analyze(copy.deepcopy(results), roster, score, cache=cache) == \
+            reference(results, roster, score)
+        assert len(cache) <= 4
+
+    # BA and CB fill the cache, BA is used again, so adding DC evicts CB
+    cache = assignment1.CanonicalTeamCache(max_size=2)
+    assert cache.canonical("BA", 4) == "AB"
+    assert cache.canonical("CB", 4) == "BC"
+    assert cache.canonical("BA", 4) == "AB"
+    assert cache.canonical("DC", 4) == "CD"
+    assert list(cache.teams) == [("BA", 4), ("DC", 4)]
+    assert (cache.hits, cache.misses) == (1, 3)
+
+    # CB was evicted, so it is sorted again and evicts BA
+    assert cache.canonical("CB", 4) == "BC"
+    assert list(cache.teams) == [("DC", 4), ("CB", 4)]
+    assert (cache.hits, cache.misses) == (1, 4)
+
+    with pytest.raises(ValueError):
+        assignment1.CanonicalTeamCache(max_size=0)
+
+
+def test_parallel():
+    for results, roster, score in SMALL_CASES:
+        assert assignment1.analyze(copy.deepcopy(results), roster, score, engine="parallel") == \
+            reference(results, roster, score)
+        for workers in [1, 2]:
+            assert assignment1.analyze_parallel(results, roster, score, workers=workers) == \
+                reference(results, roster, score)
+
+    with pytest.raises(ValueError):
+        assignment1.analyze_parallel([["A", "B", 1]], 2, 1, workers=0)
+
+
+def test_shared():
+    for results, roster, score in SMALL_CASES:
+        for workers in [1, 2]:
+            assert assignment1.analyze_shared(results, roster, score, workers=workers) == \
+                reference(results, roster, score)
+
+    with pytest.raises(ValueError):
+        assignment1.analyze_shared([["A", "B", 1]], 2, 1, workers=0)
+
+
+def test_match_file_round_trip(tmp_path):
+    for i, (results, roster, score) in enumerate(CASES):
+        path = str(tmp_path / ("matches" + str(i) + ".bin"))
+        assignment1.write_match_file(path, results, roster)
+        assert assignment1.analyze_file(path, score) == reference(results, roster, score)
+
+        # The columns are views of the mapped file, not copies
+        table = assignment1.load_match_file(path)
+        assert table.roster == roster and len(table) == len(results)
+        assert all(isinstance(column, memoryview) for column in table.team1 + table.team2 + [table.scores])
+        assert [table.match(j) for j in range(len(table))] == \
+            [["".join(sorted(team1)), "".join(sorted(team2)), value] for team1, team2, value in results]
+
+    # A file cut short and a file of another format are rejected; the last table is released first,
+    # as its columns still map the file
+    del table
+    with open(path, "rb") as file:
+        data = file.read()
+    for bad in [data[:-1], b"[]"]:
+        with open(path, "wb") as file:
+            file.write(bad)
+        with pytest.raises(ValueError):
+            assignment1.load_match_file(path)
+
+
+def test_out_of_core(tmp_path):
+    for results, roster, score in CASES:
+        got = assignment1.analyze_out_of_core(iter(copy.deepcopy(results)), roster, score, memory_budget=64,
+                                              spill_dir=str(tmp_path))
+        assert got == reference(results, roster, score)
+
+    # Empty teams write no bytes to the spill files, but their buckets are not empty
+    for results in [[["", "", 5]], [["", "", 5], ["", "", 95], ["", "", 40]]]:
+        for score in EDGE_SCORES:
+            assert assignment1.analyze_out_of_core(results, 1, score, spill_dir=str(tmp_path)) == \
+                assignment1.analyze(copy.deepcopy(results), 1, score) == reference(results, 1, score)
+
+
+def test_stream():
+    for results, roster, score in CASES:
+        matches = (list(match) for match in results)
+        assert assignment1.analyze_stream(matches, roster, score, batch_size=5) == reference(results, roster, score)
+
+        analyzer = assignment1.IncrementalAnalyzer(roster)
+        analyzer.add_stream(iter(copy.deepcopy(results)), batch_size=7)
+        assert [analyzer.top10(), analyzer.search(score)] == reference(results, roster, score)
+
+
+def test_hashed_does_not_modify_results():
+    for results, roster, score in CASES:
+        original = copy.deepcopy(results)
+        assert assignment1.analyze_hashed(results, roster, score) == reference(results, roster, score)
+        assert results == original
+
+
+def test_profiler():
+    results, roster, score = CASES[-1]
+    records = []
+    profiler = assignment1.StageProfiler(callback=records.append)
+    assert assignment1.analyze(copy.deepcopy(results), roster, score, profiler=profiler) == \
+        reference(results, roster, score)
+    assert records == profiler.stages and len(records) > 0
+    assert all(record["rows"] >= 0 and record["seconds"] >= 0 and "peak_memory" not in record for record in records)
+    assert profiler.total_seconds() == sum(record["seconds"] for record in records)
+
+
+def test_profiler_tracks_memory():
+    import tracemalloc
+
+    results, roster, score = CASES[-1]
+
+    # The profiler starts tracing for every stage and stops it again afterwards
+    profiler = assignment1.StageProfiler(track_memory=True)
+    assignment1.analyze(copy.deepcopy(results), roster, score, profiler=profiler)
+    assert len(profiler.stages) > 0
+    assert all(record["peak_memory"] >= 0 for record in profiler.stages)
+    assert max(record["peak_memory"] for record in profiler.stages) > 0
+    assert not tracemalloc.is_tracing()
+
+    # Tracing that was already on is left on
+    tracemalloc.start()
+    try:
+        profiler = assignment1.StageProfiler(track_memory=True)
+        with profiler.stage("allocate", 1000):
+            block = [[i] for i in range(1000)]
+        assert tracemalloc.is_tracing()
+        assert profiler.stages[0]["peak_memory"] > 0 and len(block) == 1000
+    finally:
+        tracemalloc.stop()
+
+
+def test_import_is_lazy():
+    # A fresh interpreter, as the tests have already imported the optional modules
+    code = ("import sys; import assignment1; "
+            "print(sorted(name for name in ['numpy', 'asyncio', 'concurrent.futures', 'multiprocessing', 'mmap', "
+            "'tempfile', 'tracemalloc', 'argparse'] if name in sys.modules))")
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(assignment1.__file__)).stdout
+    assert output.strip() == "[]"
+
+
+def test_command_line(tmp_path, capsys):
+    results, roster, score = CASES[-1]
+    json_path = tmp_path / "results.json"
+    json_path.write_text(json.dumps(results))
+    csv_path = tmp_path / "results.csv"
+    csv_path.write_text("".join(team1 + "," + team2 + "," + str(value) + "\n" for team1, team2, value in results))
+    match_path = str(tmp_path / "results.bin")
+    assignment1.write_match_file(match_path, results, roster)
+
+    for workers in ["1", "2"]:
+        status = assignment1.main([str(json_path), str(csv_path), match_path, "--roster", str(roster),
+                                   "--score", str(score), "--score", "-3", "--workers", workers])
+        assert status == 0
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 3
+        for line in lines:
+            finding = json.loads(line)
+            assert finding["top"] == reference(results, roster, score)[0]
+            assert finding["searched"][0]["matches"] == reference(results, roster, score)[1]
+            assert finding["searched"][1]["matches"] == reference(results, roster, -3)[1]
+
+    # A missing file is reported as an error line and makes the exit status 1
+    assert assignment1.main([str(tmp_path / "missing.json"), "--workers", "1"]) == 1
+    assert "error" in json.loads(capsys.readouterr().out)
+
+
+def test_auto_engine():
+    for results, roster, score in CASES:
+        original = copy.deepcopy(results)
+        assert assignment1.analyze(results, roster, score, engine="auto") == reference(results, roster, score)
+        assert results == original
+        assert assignment1.choose_engine(results, roster)[0] != "python"
+
+    # Small and large inputs are both left alone
+    for n in [10, 300]:
+        results = generate(n, 3, 5, random.Random(n))
+        original = copy.deepcopy(results)
+        assignment1.analyze(results, 5, 50, engine="auto")
+        assert results == original
+
+
+def test_auto_engine_is_recorded():
+    records = []
+    profiler = assignment1.StageProfiler(callback=records.append)
+    results = [["AB", "BA", 30]] * 300
+    assignment1.analyze(results, 2, 30, engine="auto", profiler=profiler)
+    assert records == profiler.stages
+    assert records[0]["stage"] == "choose_engine"
+    assert (records[0]["engine"], records[0]["reason"]) == assignment1.choose_engine(results, 2)
+    assert records[1]["stage"] == "engine " + records[0]["engine"]
+
+
+def test_service_coalesces_and_caches():
+    results, roster, score = CASES[-1]
+
+    async def run():
+        service = assignment1.AnalysisService()
+        first, second = await asyncio.gather(service.analyze(results, roster, score, "a" * 40),
+                                             service.analyze(results, roster, 0, "a" * 40))
+        assert (service.misses, service.coalesced, service.hits) == (1, 1, 0)
+
+        # Without a fingerprint the results are hashed, which gives another key
+        third = await service.analyze(results, roster, 100)
+        assert (service.misses, service.hits) == (2, 0)
+        fourth = await service.analyze(results, roster, -1)
+        assert (service.misses, service.hits) == (2, 1)
+        return first, second, third, fourth
+
+    first, second, third, fourth = asyncio.run(run())
+    assert first == reference(results, roster, score)
+    assert second == reference(results, roster, 0)
+    assert third == reference(results, roster, 100)
+    assert fourth == reference(results, roster, -1)
+
+
+def test_service_evicts_least_recently_used():
+    datasets = [generate(20, 2, 4, random.Random(seed)) for seed in range(3)]
+
+    async def run():
+        service = assignment1.AnalysisService(max_entries=2)
+        await service.prepare(datasets[0], 4, "0")
+        await service.prepare(datasets[1], 4, "1")
+        await service.prepare(datasets[0], 4, "0")
+        await service.prepare(datasets[2], 4, "2")
+        assert list(service.cache) == [("0", 4), ("2", 4)]
+        assert (service.misses, service.hits) == (3, 1)
+
+        # The evicted results are sorted again
+        assert await service.analyze(datasets[1], 4, 50, "1") == reference(datasets[1], 4, 50)
+        assert service.misses == 4
+
+    asyncio.run(run())
+    with pytest.raises(ValueError):
+        assignment1.AnalysisService(max_entries=0)
+
+
+def test_snapshot_round_trip(tmp_path):
+    for i, (results, roster, score) in enumerate(CASES):
+        path = str(tmp_path / ("snapshot" + str(i) + ".bin"))
+        fingerprint = assignment1.dataset_fingerprint(results)
+        assignment1.save_snapshot(path, assignment1.PreparedResults(results, roster), fingerprint)
+        snapshot = assignment1.load_snapshot(path, fingerprint)
+        try:
+            assert [snapshot.top10(), snapshot.search(score)] == reference(results, roster, score)
+            assert snapshot.top(3) == reference(results, roster, score)[0][:3]
+        finally:
+            snapshot.close()
+
+    # A snapshot of other results is stale
+    with pytest.raises(ValueError):
+        assignment1.load_snapshot(path, assignment1.dataset_fingerprint([["A", "B", 1]]))
+
+
+def test_merge_new_matches():
+    rng = random.Random(3)
+    for _ in range(20):
+        roster = rng.randint(1, 6)
+        results = generate(rng.choice([0, 5, 100]), 3, roster, rng)
+        batch = generate(rng.choice([0, 1, 50]), 3, roster, rng) + copy.deepcopy(results[:3])
+        prepared = assignment1.PreparedResults(results, roster)
+        before = [prepared.top10(), prepared.search(50)]
+
+        updated = prepared.with_matches(batch)
+        assert [updated.top10(), updated.search(50)] == reference(results + batch, roster, 50)
+        assert assignment1.merge_new_matches(prepared.matches, batch, roster) == \
+            [list(match) for match in reference_order(results + batch)]
+
+        # The prepared results, which may be cached by AnalysisService, are left as they were
+        assert [prepared.top10(), prepared.search(50)] == before
+
+
+def test_compact_score_sort():
+    for results, roster, score in CASES:
+        lst = copy.deepcopy(results)
+        assignment1.add_reverse(lst)
+        lst = [[assignment1.counting_sort_string(team1, roster), assignment1.counting_sort_string(team2, roster),
+                value] for team1, team2, value in lst]
+        lst = assignment1.radix_sort_team(lst, roster, 1)
+        lst = assignment1.radix_sort_team(lst, roster, 0)
+
+        # The compact pass leaves out the duplicates that filter_duplicates marks with None
+        legacy = assignment1.radix_sort_score(lst)
+        assignment1.filter_duplicates(legacy)
+        score_index = [[0, 0] for i in range(101)]
+        compact = assignment1.radix_sort_score(lst, score_index, compact=True)
+        assert compact == [match for match in legacy if match is not None]
+        assert None not in compact
+        assert compact == [list(match) for match in reference_order(results)]
+        assert assignment1.search_score_index(compact, score_index, score) == reference(results, roster, score)[1]
+
+
+def test_msd_teams_of_different_lengths():
+    rng = random.Random(2)
+    for _ in range(20):
+        results = [["".join(chr(65 + rng.randrange(4)) for _ in range(rng.randint(0, 4))),
+                    "".join(chr(65 + rng.randrange(4)) for _ in range(rng.randint(0, 4))),
+                    rng.randrange(101)] for _ in range(rng.choice([1, 30, 200]))]
+        score = rng.choice(EDGE_SCORES)
+        original = copy.deepcopy(results)
+        assert assignment1.analyze_msd(results, 4, score) == reference(results, 4, score)
+        if len({len(team) for match in results for team in match[:2]}) > 1:
+            assert assignment1.choose_engine(results, 4)[0] == "msd"
+        assert assignment1.analyze(results, 4, score, engine="auto") == reference(results, 4, score)
+        assert results == original
@@ -0,0 +1,30 @@
+"""
+Tests for the benchmark harness in benchmark.py.
+
+Run with: python -m pytest -q
+"""
+import json
+
+import benchmark
+
+
+def test_generate_results():
+    results = benchmark.generate_results(200, 4, 3, seed=1, score_distribution="skewed", duplicate_rate=0.5)
+    assert len(results) == 200
+    for team1, team2, score in results:
+        assert len(team1) == len(team2) == 4 and set(team1 + team2) <= set("ABC") and 0 <= score <= 100
+    assert results == benchmark.generate_results(200, 4, 3, seed=1, score_distribution="skewed", duplicate_rate=0.5)
+
+
+def test_report(tmp_path):
+    path = tmp_path / "bench.json"
+    benchmark.main(["--sizes", "50", "--widths", "2", "--rosters", "3", "--distributions", "uniform",
+                    "--duplicate-rates", "0.5", "--engines", "python", "hashed", "--repeat", "1",
+                    "--output", str(path)])
+    report = json.loads(path.read_text())
+    assert len(report["runs"]) == 1
+    run = report["runs"][0]
+    assert set(run["stages"]) == {"add_reverse", "counting_sort_string", "radix_sort_team", "radix_sort_score",
+                                  "search_score_index"}
+    assert set(run["engines"]) == {"python", "hashed"}
+    assert all(seconds >= 0 for seconds in list(run["stages"].values()) + list(run["engines"].values()))